@@ -1,12 +1,25 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import plotly.express as px
 import plotly.graph_objects as go
 
 # Import styling module
 from styles import get_theme_css
+from data_loader import BRIDGE_TABLES, TABLES, build_bridge, ingest_table, ingest_report, load_workers, table_file, table_signature
+from schemas import GAMES_TZ, MEDAL_FIELDS, resolve_columns
+from filters import apply_filters, build_index, compile_filters, medal_columns, table_spec
+from funnel import FUNNEL_STAGES, funnel_participants, medal_mismatches, qualification_funnel
+from leaderboards import medal_hierarchy, medal_leaderboard, rollup
+from medal_cube import COUNTRY_GRAIN, build_cube, cube_rollup
+from competition_keys import build_stage_keys, link_coverage, linked_event_codes, linked_rows, stage_key_of, stage_start_times
+from demographics import age_summary
+from name_search import SEARCH_LIMIT, build_name_index, search_keys
+from profiles import PROFILE_COACHES, PROFILE_LOOKUPS, key_index, rows_for
+from progression import advanced_to, build_progression_index, entries_of, stages_of
+from start_bias import bias_rollup, bias_stage_types, build_bias_cube
+from results_store import combine_partitions, filter_results, ingest_partition, partition_signature, result_disciplines, result_margins
 
 # ==================== PAGE CONFIG ====================
 st.set_page_config(
@@ -17,65 +30,265 @@ st.set_page_config(
 )
 
 # ==================== DATA LOADING ====================
-@st.cache_data(show_spinner=False)
-def load_data():
-    """Load all CSV files from the data directory"""
-    data_dir = Path(__file__).parent / "data"
+# Tables the sidebar filters need on every page
+SIDEBAR_TABLES = ('medals_total', 'events')
 
-    data = {}
+# Loaded tables are held once per process and shared by every session. With
+# copy-on-write (the default from pandas 3), frames derived from them - filters,
+# column selections, shallow copies - only copy data when they are written to.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+def _read_only(df):
+    """Per-caller handle on a shared frame: writes to it never reach the shared data"""
+    return df.copy(deep=False)
+
+@st.cache_resource(show_spinner=False)
+def _load_table(name, signature):
+    """
+    Load a single table, shared by all sessions and cached per version of its CSV file.
 
+    Failures are cached too, so a corrupt file is not re-parsed on every rerun;
+    editing the file changes its signature and only that table is re-ingested.
+    Bridge tables are exploded from the shared copy of their source table.
+    """
     try:
-        # Load main datasets
-        data['athletes'] = pd.read_csv(data_dir / 'athletes.csv')
-        data['coaches'] = pd.read_csv(data_dir / 'coaches.csv')
-        data['events'] = pd.read_csv(data_dir / 'events.csv')
-        data['medals'] = pd.read_csv(data_dir / 'medals.csv')
-        data['medals_total'] = pd.read_csv(data_dir / 'medals_total.csv')
-        data['medallists'] = pd.read_csv(data_dir / 'medallists.csv')
-        data['nocs'] = pd.read_csv(data_dir / 'nocs.csv')
-        data['schedules'] = pd.read_csv(data_dir / 'schedules.csv')
-        data['teams'] = pd.read_csv(data_dir / 'teams.csv')
-        data['technical_officials'] = pd.read_csv(data_dir / 'technical_officials.csv')
-        data['venues'] = pd.read_csv(data_dir / 'venues.csv')
-        data['torch_route'] = pd.read_csv(data_dir / 'torch_route.csv')
-
-        # Create continent mapping
-        continent_mapping = {
-            'USA': 'North America', 'CAN': 'North America', 'MEX': 'North America',
-            'FRA': 'Europe', 'GBR': 'Europe', 'GER': 'Europe', 'ITA': 'Europe', 'ESP': 'Europe',
-            'NED': 'Europe', 'SWE': 'Europe', 'NOR': 'Europe', 'AUS': 'Oceania', 'NZL': 'Oceania',
-            'CHN': 'Asia', 'JPN': 'Asia', 'KOR': 'Asia', 'IND': 'Asia', 'THA': 'Asia', 'PAK': 'Asia',
-            'BRA': 'South America', 'ARG': 'South America', 'CHL': 'South America', 'COL': 'South America',
-            'RSA': 'Africa', 'EGY': 'Africa', 'NGR': 'Africa', 'KEN': 'Africa', 'ETH': 'Africa',
-            'RUS': 'Europe', 'KAZ': 'Asia', 'UZB': 'Asia', 'TUR': 'Europe', 'IRN': 'Asia', 'ISR': 'Asia',
-        }
+        if name in BRIDGE_TABLES:
+            source, error = _load_table(BRIDGE_TABLES[name]['source'], signature)
+            return (pd.DataFrame(), error) if error else (build_bridge(name, source), None)
+        return ingest_table(name), None
+    except Exception as e:
+        return pd.DataFrame(), str(e).strip()
 
-        # Add continent to medals_total
-        if 'country_code' in data['medals_total'].columns:
-            data['medals_total']['continent'] = data['medals_total']['country_code'].map(continent_mapping).fillna('Other')
-
-        # Extract unique sports from events data
-        if not data['events'].empty:
-            # Try different column names for sport
-            sport_column = None
-            for col in data['events'].columns:
-                if col.lower() == 'sport':
-                    sport_column = col
-                    break
-            
-            if sport_column:
-                unique_sports = data['events'][sport_column].dropna().unique().tolist()
-                data['unique_sports'] = sorted([s for s in unique_sports if isinstance(s, str)])
-            else:
-                data['unique_sports'] = []
+def table_status(name):
+    """
+    Report whether a table can be used.
+
+    Returns:
+    - (status, detail) where status is "loaded", "missing" or "failed"
+    """
+    signature = table_signature(name)
+    if signature is None:
+        return "missing", f"{table_file(name)} not found in the data directory"
+
+    _, error = _load_table(name, signature)
+    if error:
+        return "failed", error
+    return "loaded", None
+
+def load_table(name):
+    """Load a single table from the data directory (empty DataFrame if unavailable)"""
+    signature = table_signature(name)
+    if signature is None:
+        return pd.DataFrame()
+
+    df, _ = _load_table(name, signature)
+    return _read_only(df)
+
+def _map_concurrently(func, keys, max_workers=None):
+    """Call func on every key using a thread pool, returning {key: result}"""
+    workers = min(max_workers or load_workers(), len(keys))
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(zip(keys, pool.map(func, keys)))
+    return {key: func(key) for key in keys}
+
+def load_tables(names, max_workers=None):
+    """
+    Load only the given tables, e.g. the ones a page declares it needs.
+
+    The frames are shared with every other session; the returned handles can be
+    filtered and extended freely, only the columns written to are copied.
+
+    Each table is loaded independently: a missing or unreadable file is left
+    out of the returned dict and reported once, while the other tables load normally.
+    Tables are ingested concurrently (pandas releases the GIL while parsing), so a
+    cold load takes about as long as the largest file.
+
+    Parameters:
+    - names: table names from the registry
+    - max_workers: thread count, defaults to load_workers() (OLYMPIC_LOAD_WORKERS)
+    """
+    signatures = {name: table_signature(name) for name in names}
+    available = [name for name in names if signatures[name] is not None]
+    results = _map_concurrently(lambda name: _load_table(name, signatures[name]), available, max_workers)
+
+    data = {}
+    problems = []
+
+    for name in names:
+        if name not in results:
+            problems.append(f"**{name}** ({table_file(name)} not found in the data directory)")
+            continue
+
+        df, error = results[name]
+        if error:
+            problems.append(f"**{name}** ({error})")
         else:
-            data['unique_sports'] = []
+            data[name] = _read_only(df)
 
-        return data
+    if problems:
+        st.warning(
+            "Some data could not be loaded, sections that depend on it are hidden: "
+            + ", ".join(problems)
+        )
 
+    return data
+
+def load_data():
+    """Load all CSV files from the data directory"""
+    return load_tables(TABLES)
+
+# ==================== RESULTS STORE ====================
+@st.cache_resource(show_spinner=False)
+def _load_results_partition(discipline, signature):
+    """Load one discipline's result file, cached per discipline and file version"""
+    try:
+        return ingest_partition(discipline), None
     except Exception as e:
-        st.error(f"Error loading data: {e}")
+        return pd.DataFrame(), str(e).strip()
+
+@st.cache_resource(show_spinner=False)
+def _combine_results(disciplines, signatures):
+    frames = _map_concurrently(
+        lambda discipline: _load_results_partition(discipline, signatures[disciplines.index(discipline)])[0],
+        list(disciplines)
+    )
+    return combine_partitions([frames[discipline] for discipline in disciplines])
+
+@st.cache_resource(show_spinner=False)
+def _results_index(disciplines, signatures):
+    """Bitmap index of a combined results table, built once per set of partition versions"""
+    return build_index(_combine_results(disciplines, signatures))
+
+def _results_key(disciplines=None):
+    """(disciplines, signatures) identifying the available partitions of a results query"""
+    if disciplines is None:
+        disciplines = result_disciplines()
+
+    signatures = {discipline: partition_signature(discipline) for discipline in disciplines}
+    available = tuple(sorted(discipline for discipline, signature in signatures.items() if signature is not None))
+    return available, tuple(signatures[discipline] for discipline in available)
+
+def load_results(disciplines=None):
+    """
+    Load the results store, reading only the requested discipline partitions.
+
+    Parameters:
+    - disciplines: discipline names (file names in data/results/), all of them when None
+
+    Returns:
+    - one typed DataFrame with the results of those disciplines
+    """
+    return _read_only(_combine_results(*_results_key(disciplines)))
+
+def query_results(disciplines=None, event_code=None, stage_code=None, participant_code=None, country_code=None,
+                  spec=None):
+    """
+    Query the results store, e.g. one event, one stage or one athlete.
+
+    Narrowing on disciplines first keeps the other partitions unloaded;
+    the remaining criteria accept a single value or a list. A filter spec from
+    compile_filters() applies the sidebar selections through the results' bitmap index.
+    """
+    key = _results_key(disciplines)
+    results = _read_only(_combine_results(*key))
+    if spec:
+        results = apply_filters(results, spec, _results_index(*key))
+
+    return filter_results(
+        results,
+        event_code=event_code,
+        stage_code=stage_code,
+        participant_code=participant_code,
+        country_code=country_code
+    )
+
+# ==================== COMPETITION KEYS ====================
+@st.cache_resource(show_spinner=False)
+def _stage_keys(schedules_signature, medals_signature, disciplines, signatures):
+    """Stage keys linking schedules, medals and results, built once per version of the three sources"""
+    schedules, _ = _load_table('schedules', schedules_signature)
+    medals, _ = _load_table('medals', medals_signature)
+    return build_stage_keys(schedules, medals, _combine_results(disciplines, signatures))
+
+def session_details(session):
+    """
+    Results and medals of a schedule session, retrieved through its stage key.
+
+    Parameters:
+    - session: row position of the session in the schedules table (its index label,
+      kept by filtered frames)
+
+    Returns:
+    - dict of DataFrames: results (rows of the session's stage) and medals (awarded
+      at it), both empty when the session has no result page; a session of a whole
+      round gets the results of all its heats
+    """
+    schedules_signature = table_signature('schedules')
+    medals_signature = table_signature('medals')
+    if schedules_signature is None or medals_signature is None:
+        return {'results': pd.DataFrame(), 'medals': pd.DataFrame()}
+
+    results_key = _results_key()
+    keys = _stage_keys(schedules_signature, medals_signature, *results_key)
+    stage_key = stage_key_of(keys, session)
+    medals, _ = _load_table('medals', medals_signature)
+    return {
+        'results': _read_only(linked_rows(_combine_results(*results_key), keys, 'result', stage_key)),
+        'medals': _read_only(linked_rows(medals, keys, 'medal', stage_key)),
+    }
+
+def session_coverage():
+    """
+    Sessions and medals whose stage key reaches result rows.
+
+    Returns:
+    - dict {'sessions': (with linked results, total), 'medals': (with linked results, total)},
+      empty when schedules or medals are not available
+    """
+    schedules_signature = table_signature('schedules')
+    medals_signature = table_signature('medals')
+    if schedules_signature is None or medals_signature is None:
         return {}
+    return link_coverage(_stage_keys(schedules_signature, medals_signature, *_results_key()))
+
+# ==================== EVENT PROGRESSION ====================
+@st.cache_resource(show_spinner=False)
+def _progression_index(schedules_signature, medals_signature, disciplines, signatures):
+    """Progression index of the combined results of some disciplines, ordered by the schedule, built once per version"""
+    schedules, _ = _load_table('schedules', schedules_signature)
+    keys = _stage_keys(schedules_signature, medals_signature, disciplines, signatures)
+    return build_progression_index(_combine_results(disciplines, signatures), stage_start_times(keys, schedules))
+
+def _progression_key(disciplines=None):
+    """Cache key of the progression index: versions of the schedules and medals (stage keys) and of the results"""
+    return (table_signature('schedules'), table_signature('medals')) + _results_key(disciplines)
+
+def event_progression(event_code, disciplines=None):
+    """
+    Stages of an event in the order it was contested, found by index lookup.
+
+    Returns:
+    - one row per stage with its phase_order (1 = first round), entries and the
+      number of entrants who advanced to a later phase
+    """
+    return _read_only(stages_of(_progression_index(*_progression_key(disciplines)), event_code))
+
+def stage_progression(stage_code, to_stage_code=None, disciplines=None):
+    """
+    Participants of a stage with how far each of them went in the event.
+
+    Parameters:
+    - stage_code: stage (heat, semifinal...) whose entrants are listed
+    - to_stage_code: optional later stage; only entrants who also competed in it are kept,
+      with their rank there ('to_rank')
+    - disciplines: partitions the stage belongs to, all of them when None
+    """
+    index = _progression_index(*_progression_key(disciplines))
+    if to_stage_code is None:
+        return _read_only(entries_of(index, stage_code))
+    return _read_only(advanced_to(index, stage_code, to_stage_code))
 
 # ==================== THEME TOGGLE ====================
 def render_theme_toggle():
@@ -92,152 +305,365 @@ def render_theme_toggle():
             st.rerun()
 
 # ==================== FILTER FUNCTIONS ====================
-def filter_medals_data(medals_df, medal_filters, selected_countries, selected_continent):
-    """
-    Filter medals data based on selected filters
-    """
-    if medals_df.empty:
-        return medals_df, []
-    
-    filtered_df = medals_df.copy()
-    
-    # Filter by medal type
-    medal_cols = []
-    
-    # Check what type of medal_filters we have (dictionary or list)
-    if isinstance(medal_filters, dict):
-        # It's a dictionary from the main app sidebar
-        if medal_filters.get('gold', True):
-            if 'gold_medals' in filtered_df.columns:
-                medal_cols.append('gold_medals')
-            elif 'Gold Medal' in filtered_df.columns:
-                medal_cols.append('Gold Medal')
-            elif 'gold' in filtered_df.columns:
-                medal_cols.append('gold')
-                
-        if medal_filters.get('silver', True):
-            if 'silver_medals' in filtered_df.columns:
-                medal_cols.append('silver_medals')
-            elif 'Silver Medal' in filtered_df.columns:
-                medal_cols.append('Silver Medal')
-            elif 'silver' in filtered_df.columns:
-                medal_cols.append('silver')
-                
-        if medal_filters.get('bronze', True):
-            if 'bronze_medals' in filtered_df.columns:
-                medal_cols.append('bronze_medals')
-            elif 'Bronze Medal' in filtered_df.columns:
-                medal_cols.append('Bronze Medal')
-            elif 'bronze' in filtered_df.columns:
-                medal_cols.append('bronze')
-    else:
-        # It's a list from somewhere else
-        for medal_type in medal_filters:
-            if medal_type == 'Gold':
-                if 'gold_medals' in filtered_df.columns:
-                    medal_cols.append('gold_medals')
-                elif 'Gold Medal' in filtered_df.columns:
-                    medal_cols.append('Gold Medal')
-                elif 'gold' in filtered_df.columns:
-                    medal_cols.append('gold')
-            elif medal_type == 'Silver':
-                if 'silver_medals' in filtered_df.columns:
-                    medal_cols.append('silver_medals')
-                elif 'Silver Medal' in filtered_df.columns:
-                    medal_cols.append('Silver Medal')
-                elif 'silver' in filtered_df.columns:
-                    medal_cols.append('silver')
-            elif medal_type == 'Bronze':
-                if 'bronze_medals' in filtered_df.columns:
-                    medal_cols.append('bronze_medals')
-                elif 'Bronze Medal' in filtered_df.columns:
-                    medal_cols.append('Bronze Medal')
-                elif 'bronze' in filtered_df.columns:
-                    medal_cols.append('bronze')
-            elif medal_type == 'Total' and 'total_medals' in filtered_df.columns:
-                medal_cols.append('total_medals')
-    
-    # Filter by country
-    if selected_countries:
-        country_col = 'country_long' if 'country_long' in filtered_df.columns else 'country'
-        if country_col in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df[country_col].isin(selected_countries)]
-    
-    # Filter by continent
-    if selected_continent:
-        if isinstance(selected_continent, list):
-            if selected_continent and selected_continent != ["All"] and 'continent' in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df['continent'].isin(selected_continent)]
-        else:
-            if selected_continent != "All" and 'continent' in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df['continent'] == selected_continent]
-    
-    return filtered_df, medal_cols
-
-def filter_athletes_data(athletes_df, selected_countries, selected_sports, selected_continent):
-    """
-    Filter athletes data based on selected filters
-    """
-    if athletes_df.empty:
-        return athletes_df
-    
-    filtered_df = athletes_df.copy()
-    
-    # Filter by country
-    if selected_countries:
-        country_col = 'country_long' if 'country_long' in filtered_df.columns else 'country'
-        if country_col in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df[country_col].isin(selected_countries)]
-    
-    # Filter by sport
-    if selected_sports:
-        if 'sport' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['sport'].isin(selected_sports)]
-    
-    # Filter by continent (if continent column exists)
-    if selected_continent and 'continent' in filtered_df.columns:
-        if isinstance(selected_continent, list):
-            if selected_continent:
-                filtered_df = filtered_df[filtered_df['continent'].isin(selected_continent)]
+# Distinct (table, filters) results kept in memory
+FILTER_CACHE_ENTRIES = 256
+
+@st.cache_resource(show_spinner=False)
+def _filter_index(name, signature):
+    """Bitmap index of a shared table's filter dimensions, built once per version of its CSV file"""
+    df, _ = _load_table(name, signature)
+    return build_index(df)
+
+@st.cache_resource(show_spinner=False, max_entries=FILTER_CACHE_ENTRIES)
+def _filter_table(name, signature, spec):
+    """Rows of a table matching a table spec, computed once per process for each (table, spec)"""
+    df, error = _load_table(name, signature)
+    return df if error else apply_filters(df, spec, _filter_index(name, signature))
+
+def filter_tables(data, spec):
+    """
+    Apply a compiled filter spec to every loaded table.
+
+    Row masks come from each table's precomputed bitmap index, and the filtered
+    tables are memoized per (table, spec) across pages and sessions, so moving
+    between pages with the same sidebar filters does not filter anything again.
+
+    Parameters:
+    - data: tables returned by load_tables()
+    - spec: filter spec from compile_filters()
+
+    Returns:
+    - dict with the same keys holding the filtered tables
+    """
+    filtered = {}
+    for name, df in data.items():
+        row_spec = table_spec(df, spec)
+        if not row_spec or (name not in TABLES and name not in BRIDGE_TABLES):
+            filtered[name] = apply_filters(df, row_spec)
         else:
-            if selected_continent != "All":
-                filtered_df = filtered_df[filtered_df['continent'] == selected_continent]
-    
-    return filtered_df
-
-def filter_events_data(events_df, selected_sports, selected_countries):
-    """
-    Filter events data based on selected filters
-    """
-    if events_df.empty:
-        return events_df
-    
-    filtered_df = events_df.copy()
-    
-    # Filter by sport
-    if selected_sports:
-        # Find sport column (case-insensitive)
-        sport_col = None
-        for col in filtered_df.columns:
-            if col.lower() == 'sport':
-                sport_col = col
-                break
-        
-        if sport_col:
-            filtered_df = filtered_df[filtered_df[sport_col].isin(selected_sports)]
-    
-    # Filter by country (if country column exists)
-    if selected_countries:
-        country_col = None
-        for col in filtered_df.columns:
-            if 'country' in col.lower():
-                country_col = col
-                break
-        
-        if country_col:
-            filtered_df = filtered_df[filtered_df[country_col].isin(selected_countries)]
-    
-    return filtered_df
+            filtered[name] = _read_only(_filter_table(name, table_signature(name), row_spec))
+    return filtered
+
+@st.cache_resource(show_spinner=False, max_entries=FILTER_CACHE_ENTRIES)
+def _medal_ranking(name, signature, spec, by):
+    """Full medal leaderboard of a filtered per-medal table, computed once per (table, spec, dimension)"""
+    return medal_leaderboard(_filter_table(name, signature, spec), by)
+
+def top_by_medals(spec, by='athlete', top=10, table='medallists'):
+    """
+    Top entities by medal count under the sidebar filters.
+
+    Parameters:
+    - spec: filter spec from compile_filters()
+    - by: ranking dimension in LEADERBOARD_KEYS ('athlete', 'country', 'discipline', 'team')
+    - top: number of rows returned, all of them when None
+    - table: per-medal table ranked ('medallists' or 'medals')
+
+    Returns:
+    - leaderboard from medal_leaderboard(), empty when the table is unavailable
+    """
+    signature = table_signature(table)
+    if signature is None:
+        return pd.DataFrame()
+
+    df, error = _load_table(table, signature)
+    if error:
+        return pd.DataFrame()
+
+    board = _read_only(_medal_ranking(table, signature, table_spec(df, spec), by))
+    return board if top is None else board.head(top)
+
+# ==================== MEDAL CUBE ====================
+@st.cache_resource(show_spinner=False)
+def _medal_cube(signature):
+    """
+    Medal cube of medals.csv and its bitmap index, built once per version of the file.
+
+    medals.csv lists one bronze more than medals_total.csv (1044 medals against 1043,
+    an extra INA bronze in badminton), so the cube-based leaderboard gives INA one
+    bronze more than the pre-summed file.
+    """
+    medals, _ = _load_table('medals', signature)
+    cube = build_cube(medals)
+    return cube, build_index(cube)
+
+@st.cache_resource(show_spinner=False, max_entries=FILTER_CACHE_ENTRIES)
+def _cube_rollup(signature, spec, grain):
+    """Rollup of the cube cells matching a table spec, computed once per (spec, grain)"""
+    cube, index = _medal_cube(signature)
+    return cube_rollup(apply_filters(cube, spec, index), grain)
+
+def medal_counts(spec, grain=COUNTRY_GRAIN):
+    """
+    Medal counts under the sidebar filters at any grain, served from the medal cube.
+
+    Every sidebar selection applies, including sports and medal types, since the
+    cube is built from medals.csv (one row per medal) rather than from the
+    pre-summed medals_total.csv.
+
+    Parameters:
+    - spec: filter spec from compile_filters()
+    - grain: cube dimensions kept (medal_cube.CUBE_DIMENSIONS); the default gives
+      one row per country with the columns of medals_total.csv
+
+    Returns:
+    - DataFrame with the grain columns, Gold Medal, Silver Medal, Bronze Medal and Total
+    """
+    signature = table_signature('medals')
+    if signature is None:
+        return cube_rollup(build_cube(pd.DataFrame()), grain)
+
+    cube, _ = _medal_cube(signature)
+    return _read_only(_cube_rollup(signature, table_spec(cube, spec), tuple(grain)))
+
+@st.cache_resource(show_spinner=False, max_entries=FILTER_CACHE_ENTRIES)
+def _medal_hierarchy(signature, spec, levels, medals):
+    """Medal hierarchy of the cube cells matching a table spec, computed once per (spec, levels, medal types)"""
+    cube, _ = _medal_cube(signature)
+    columns = resolve_columns(cube)
+    grain = tuple(columns.get(level, level) for level in levels if level != 'medal_type')
+    return medal_hierarchy(_cube_rollup(signature, spec, grain), levels, medals)
+
+def medal_breakdown(spec, levels):
+    """
+    Medal counts per path of levels under the sidebar filters, e.g. for sunburst and treemap charts.
+
+    Compute the finest levels once and derive coarser charts from it with rollup().
+
+    Parameters:
+    - spec: filter spec from compile_filters(); its medal types select the counted medals
+    - levels: logical fields or cube dimensions and/or 'medal_type', e.g. ('continent', 'country', 'medal_type')
+
+    Returns:
+    - long-format frame from medal_hierarchy(), empty when medals.csv is unavailable
+    """
+    signature = table_signature('medals')
+    if signature is None:
+        return pd.DataFrame(columns=list(levels) + ['count'])
+
+    cube, _ = _medal_cube(signature)
+    medals = tuple(dict(spec).get('medal', MEDAL_FIELDS))
+    return _read_only(_medal_hierarchy(signature, table_spec(cube, spec), tuple(levels), medals))
+
+# ==================== ATHLETE SEARCH ====================
+@st.cache_resource(show_spinner=False)
+def _name_index(name, signature):
+    """Name index of a shared table keyed by its codes, built once per version of its CSV file"""
+    df, _ = _load_table(name, signature)
+    if 'name' not in df.columns or 'code' not in df.columns:
+        return build_name_index(pd.Series(dtype=str), pd.Series(dtype=str))
+    return build_name_index(df['name'], df['code'])
+
+@st.cache_resource(show_spinner=False, max_entries=FILTER_CACHE_ENTRIES)
+def _allowed_codes(name, signature, spec):
+    """Codes of the index kept by a table spec, as a boolean array over the index"""
+    index = _name_index(name, signature)
+    filtered = _filter_table(name, signature, spec)
+    if 'code' not in filtered.columns:
+        return None
+    return pd.Index(filtered['code'].dropna().unique()).get_indexer(index['keys']) >= 0
+
+def search_athletes(query, spec=None, limit=SEARCH_LIMIT, table='athletes'):
+    """
+    Search athletes by name server-side, so only the best matches reach the browser.
+
+    Parameters:
+    - query: text typed in the search box (prefix words, typos and missing accents are tolerated)
+    - spec: filter spec from compile_filters(); only athletes kept by the sidebar are returned
+    - limit: maximum number of athletes returned
+    - table: table whose 'name' column is searched, keyed by its 'code' column
+
+    Returns:
+    - list of athlete codes, best matches first (athletes sharing a name are distinct entries)
+    """
+    signature = table_signature(table)
+    if signature is None:
+        return []
+
+    df, error = _load_table(table, signature)
+    if error:
+        return []
+
+    allowed = _allowed_codes(table, signature, table_spec(df, spec)) if spec else None
+    return search_keys(_name_index(table, signature), query, limit, allowed)
+
+# ==================== ATHLETE PROFILES ====================
+@st.cache_resource(show_spinner=False)
+def _key_index(name, signature, column):
+    """Key index of a shared table's column, built once per version of its CSV file"""
+    df, _ = _load_table(name, signature)
+    return key_index(df, column)
+
+def lookup(lookup_name, keys):
+    """
+    Rows of a profile lookup for one key or a list of keys.
+
+    Parameters:
+    - lookup_name: lookup in PROFILE_LOOKUPS, e.g. 'medals' (medallists by athlete code)
+    - keys: a key or a list of keys of the lookup's key column
+
+    Returns:
+    - matching rows (empty when the table is unavailable or no key matches)
+    """
+    name, column = PROFILE_LOOKUPS[lookup_name]
+    signature = table_signature(name)
+    if signature is None:
+        return pd.DataFrame()
+
+    df, error = _load_table(name, signature)
+    if error:
+        return pd.DataFrame()
+    return _read_only(rows_for(df, _key_index(name, signature, column), keys))
+
+@st.cache_resource(show_spinner=False)
+def _participant_index(disciplines, signatures):
+    """Rows of each participant in the combined results of some disciplines"""
+    return key_index(_combine_results(disciplines, signatures), 'participant_code')
+
+def participant_results(participant_codes, disciplines=None):
+    """Result rows of participants (athlete or team codes), reading only the given discipline partitions"""
+    if not isinstance(participant_codes, (list, tuple)):
+        participant_codes = [participant_codes]
+    key = _results_key(disciplines)
+    return _read_only(rows_for(
+        _combine_results(*key), _participant_index(*key), [str(code) for code in participant_codes]
+    ))
+
+def _column_keys(df, column):
+    return df[column].dropna().unique().tolist() if column in df.columns else []
+
+def athlete_profile(code):
+    """
+    Rows behind one athlete profile, each found with O(1) keyed lookups on codes.
+
+    Teams come from the team_athletes bridge, coaches from the coaches of those
+    teams (team_coaches) completed with coaches of the athlete's country, and
+    results (individual and team entries) from the result partitions of the
+    athlete's disciplines.
+
+    Returns:
+    - dict of DataFrames: athlete, medals, events, disciplines, teams, coaches, results
+    """
+    athlete = lookup('athlete', code)
+    disciplines = lookup('disciplines', code)
+    team_codes = _column_keys(lookup('team_codes', code), 'team_code')
+
+    coaches = lookup('coach', _column_keys(lookup('team_coaches', team_codes), 'coach_code'))
+    if len(coaches) < PROFILE_COACHES and 'country_code' in athlete.columns and not athlete.empty:
+        country_coaches = lookup('country_coaches', athlete['country_code'].iloc[0])
+        coaches = pd.concat([coaches, country_coaches]) if not coaches.empty else country_coaches
+        if 'code' in coaches.columns:
+            coaches = coaches.drop_duplicates('code')
+
+    available = set(result_disciplines())
+    athlete_disciplines = [discipline for discipline in _column_keys(disciplines, 'discipline') if discipline in available]
+
+    return {
+        'athlete': athlete,
+        'medals': lookup('medals', code),
+        'events': lookup('events', code),
+        'disciplines': disciplines,
+        'teams': lookup('team', team_codes),
+        'coaches': coaches.head(PROFILE_COACHES),
+        'results': participant_results([code] + team_codes, athlete_disciplines) if athlete_disciplines else pd.DataFrame(),
+    }
+
+# ==================== DEMOGRAPHICS ====================
+@st.cache_resource(show_spinner=False, max_entries=FILTER_CACHE_ENTRIES)
+def _age_summary(name, signature, spec, by):
+    """Age summary of a filtered table, computed once per (table, spec, split)"""
+    return age_summary(_filter_table(name, signature, spec), by)
+
+def age_distribution(spec, table='athletes', by='gender'):
+    """
+    Age distribution of a people table under the sidebar filters.
+
+    Parameters:
+    - spec: filter spec from compile_filters()
+    - table: table with load-time age columns ('athletes', 'coaches', 'technical_officials', 'medallists')
+    - by: column splitting the box plot statistics, None for one box
+
+    Returns:
+    - summary dict from age_summary() (quantiles and counts, not rows), None when
+      the table is unavailable
+    """
+    signature = table_signature(table)
+    if signature is None:
+        return None
+
+    df, error = _load_table(table, signature)
+    if error:
+        return None
+
+    summary = _age_summary(table, signature, table_spec(df, spec), by)
+    return {key: _read_only(value) for key, value in summary.items()}
+
+# ==================== QUALIFICATION FUNNEL ====================
+@st.cache_resource(show_spinner=False)
+def _funnel_table(nocs_signature, schedules_signature, medals_signature, disciplines, signatures):
+    """Funnel levels of every entry and their bitmap index, built once per version of the results, medals and NOCs"""
+    nocs, _ = _load_table('nocs', nocs_signature)
+    medals, _ = _load_table('medals', medals_signature)
+    keys = _stage_keys(schedules_signature, medals_signature, disciplines, signatures)
+    progression = _progression_index(schedules_signature, medals_signature, disciplines, signatures)
+    participants = funnel_participants(progression, nocs, medals, linked_event_codes(keys, 'medal'))
+    return participants, build_index(participants)
+
+@st.cache_resource(show_spinner=False, max_entries=FILTER_CACHE_ENTRIES)
+def _country_funnel(nocs_signature, schedules_signature, medals_signature, disciplines, signatures, spec):
+    """Per-country funnel of the entries matching a table spec, computed once per spec"""
+    participants, index = _funnel_table(nocs_signature, schedules_signature, medals_signature, disciplines, signatures)
+    return qualification_funnel(apply_filters(participants, spec, index))
+
+def _funnel_key():
+    """Cache key of the funnel: versions of the NOCs, schedules (stage keys), medals and results"""
+    return (table_signature('nocs'), table_signature('schedules'), table_signature('medals')) + _results_key()
+
+def country_funnel(spec):
+    """
+    Qualification funnel per country (entries -> semifinal -> final -> medal) under the sidebar filters.
+
+    Returns:
+    - funnel from qualification_funnel(), one row per NOC sorted by entries
+    """
+    key = _funnel_key()
+    participants, _ = _funnel_table(*key)
+    return _read_only(_country_funnel(*key, table_spec(participants, spec)))
+
+def funnel_medal_check():
+    """Disciplines whose funnel medal total differs from medals.csv (empty when they all match)"""
+    key = _funnel_key()
+    participants, _ = _funnel_table(*key)
+    medals, _ = _load_table('medals', key[2])
+    return medal_mismatches(participants, medals)
+
+# ==================== START ORDER BIAS ====================
+@st.cache_resource(show_spinner=False)
+def _bias_cube(disciplines, signatures):
+    """Start order cube of the combined results, built once per set of partition versions"""
+    return build_bias_cube(_combine_results(disciplines, signatures))
+
+@st.cache_resource(show_spinner=False, max_entries=FILTER_CACHE_ENTRIES)
+def _bias_rollup(disciplines, signatures, discipline, stage_type):
+    """Start order statistics of one drilldown, computed once per (discipline, stage type)"""
+    return bias_rollup(_bias_cube(disciplines, signatures), discipline, stage_type)
+
+def start_order_bias(discipline=None, stage_type=None):
+    """
+    Rank statistics per start position (lane, starting order) over every heat of the Games.
+
+    Parameters:
+    - discipline: discipline to drill down to, all of them when None
+    - stage_type: stage type such as "Final" or "Round 1 - Heat", all of them when None
+
+    Returns:
+    - DataFrame from bias_rollup(): start_order, starts, mean_rank, mean_relative_rank, win_rate
+    """
+    return _read_only(_bias_rollup(*_results_key(), discipline, stage_type))
+
+def start_order_stage_types(discipline=None):
+    """Stage types with start orders, of one discipline when given, most starts first"""
+    return bias_stage_types(_bias_cube(*_results_key()), discipline)
 
 # ==================== SIDEBAR FUNCTIONS ====================
 def render_sidebar(active_page="dashboard", data=None):
@@ -245,6 +671,11 @@ def render_sidebar(active_page="dashboard", data=None):
     if data is None:
         data = {}
 
+    # Filter options come from tables the current page may not have loaded
+    missing_tables = [name for name in SIDEBAR_TABLES if name not in data]
+    if missing_tables:
+        data = {**data, **load_tables(missing_tables)}
+
     with st.sidebar:
         # Inject custom CSS to remove ONLY the logo spacer, not the collapse button
         st.markdown("""
@@ -424,10 +855,9 @@ def render_sidebar(active_page="dashboard", data=None):
             countries = []
             if 'medals_total' in data and not data['medals_total'].empty:
                 medals_df = data['medals_total']
-                if 'country_long' in medals_df.columns:
-                    countries = sorted([c for c in medals_df['country_long'].dropna().unique().tolist() if isinstance(c, str)])
-                elif 'country' in medals_df.columns:
-                    countries = sorted([c for c in medals_df['country'].dropna().unique().tolist() if isinstance(c, str)])
+                country_col = resolve_columns(medals_df).get('country')
+                if country_col:
+                    countries = sorted([c for c in medals_df[country_col].dropna().unique().tolist() if isinstance(c, str)])
             
             selected_countries = st.multiselect(
                 "🌍 Countries",
@@ -441,21 +871,16 @@ def render_sidebar(active_page="dashboard", data=None):
             sports = []
             if 'events' in data and not data['events'].empty:
                 events_df = data['events']
-                # Find sport column (case-insensitive)
-                sport_col = None
-                for col in events_df.columns:
-                    if col.lower() == 'sport':
-                        sport_col = col
-                        break
-                
+                sport_col = resolve_columns(events_df).get('sport')
                 if sport_col:
                     sports = sorted([s for s in events_df[sport_col].dropna().unique().tolist() if isinstance(s, str)])
             
             # If no sports found, try athletes data
             if not sports and 'athletes' in data and not data['athletes'].empty:
                 athletes_df = data['athletes']
-                if 'sport' in athletes_df.columns:
-                    sports = sorted([s for s in athletes_df['sport'].dropna().unique().tolist() if isinstance(s, str)])
+                sport_col = resolve_columns(athletes_df).get('sport')
+                if sport_col:
+                    sports = sorted([s for s in athletes_df[sport_col].dropna().unique().tolist() if isinstance(s, str)])
             
             # Create sports filter
             selected_sports = st.multiselect(
@@ -497,13 +922,13 @@ def render_sidebar(active_page="dashboard", data=None):
     return selected_countries, selected_sports, selected_continent, medal_filters
 
 # ==================== MAIN APP ====================
+# Tables used by the dashboard page
+PAGE_TABLES = ('athletes', 'nocs', 'events', 'medals')
+
 def main():
     # Load data
     with st.spinner("Loading data..."):
-        data = load_data()
-
-    # Store in session state
-    st.session_state['data'] = data
+        data = load_tables(PAGE_TABLES)
 
     # Apply theme
     if "theme" not in st.session_state:
@@ -527,66 +952,13 @@ def main():
     st.session_state['medal_filters'] = medal_filters
 
     # --- FILTER DATA BASED ON SELECTIONS ---
-    # Athletes
-    athletes_df = data.get('athletes', pd.DataFrame())
-    if not athletes_df.empty:
-        if selected_countries:
-            if 'country_long' in athletes_df.columns:
-                athletes_df = athletes_df[athletes_df['country_long'].isin(selected_countries)]
-        if selected_sports:
-            if 'sport' in athletes_df.columns:
-                athletes_df = athletes_df[athletes_df['sport'].isin(selected_sports)]
-        if selected_continent:
-            if 'continent' in athletes_df.columns:
-                athletes_df = athletes_df[athletes_df['continent'].isin(selected_continent)]
-
-    # Countries
-    nocs_df = data.get('nocs', pd.DataFrame())
-    if not nocs_df.empty and selected_countries:
-        if 'country' in nocs_df.columns:
-            nocs_df = nocs_df[nocs_df['country'].isin(selected_countries)]
-
-    # Sports
-    events_df = data.get('events', pd.DataFrame())
-    if not events_df.empty:
-        if selected_sports:
-            # Find sport column
-            sport_col = None
-            for col in events_df.columns:
-                if col.lower() == 'sport':
-                    sport_col = col
-                    break
-            if sport_col:
-                events_df = events_df[events_df[sport_col].isin(selected_sports)]
-        if selected_countries:
-            if 'country_long' in events_df.columns:
-                events_df = events_df[events_df['country_long'].isin(selected_countries)]
-
-    # Medals
-    medals_total_df = data.get('medals_total', pd.DataFrame())
-    if not medals_total_df.empty:
-        if selected_countries:
-            if 'country_long' in medals_total_df.columns:
-                medals_total_df = medals_total_df[medals_total_df['country_long'].isin(selected_countries)]
-        if selected_continent:
-            if 'continent' in medals_total_df.columns:
-                medals_total_df = medals_total_df[medals_total_df['continent'].isin(selected_continent)]
-        # Medal type filters
-        medal_cols = []
-        if 'Gold Medal' in medals_total_df.columns:
-            if medal_filters.get('gold', True):
-                medal_cols.append('Gold Medal')
-            if medal_filters.get('silver', True):
-                medal_cols.append('Silver Medal')
-            if medal_filters.get('bronze', True):
-                medal_cols.append('Bronze Medal')
-        else:
-            if medal_filters.get('gold', True):
-                medal_cols.append('gold')
-            if medal_filters.get('silver', True):
-                medal_cols.append('silver')
-            if medal_filters.get('bronze', True):
-                medal_cols.append('bronze')
+    spec = compile_filters(selected_countries, selected_sports, selected_continent, medal_filters)
+    filtered = filter_tables(data, spec)
+    athletes_df = filtered.get('athletes', pd.DataFrame())
+    nocs_df = filtered.get('nocs', pd.DataFrame())
+    events_df = filtered.get('events', pd.DataFrame())
+    medals_total_df = medal_counts(spec)
+    medal_cols = medal_columns(medals_total_df, spec)
 
     # Main page header with animated colors - REMOVED OLYMPIC RINGS
     banner_class = "olympic-banner-animated" if animate_header else "olympic-banner"
@@ -693,7 +1065,8 @@ def main():
         """, unsafe_allow_html=True)
 
     with col3:
-        total_sports = events_df['sport'].nunique() if 'sport' in events_df.columns else 0
+        events_sport_col = resolve_columns(events_df).get('sport')
+        total_sports = events_df[events_sport_col].nunique() if events_sport_col else 0
         st.markdown(f"""
         <div class="quick-stat">
             <div style="font-size: 2em; font-weight: bold; color: #EE334E;">{total_sports:,}</div>
@@ -743,6 +1116,17 @@ def main():
     </div>
     """, unsafe_allow_html=True)
 
+    # Data load report (per-table ingestion time, slowest first)
+    report = ingest_report()
+    if not report.empty:
+        with st.expander("⏱️ Data Load Report", expanded=False):
+            st.dataframe(
+                report,
+                use_container_width=True,
+                hide_index=True,
+                column_config={'seconds': st.column_config.NumberColumn(format="%.3f s")}
+            )
+
     st.markdown("---")
 
     # Footer
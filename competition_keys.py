@@ -0,0 +1,188 @@
+"""
+Competition keys module for Olympic Games Dashboard
+Contains the key mapping linking schedule sessions, result stages and medal
+awards, built from the result page ids the three tables share
+"""
+import numpy as np
+import pandas as pd
+
+from profiles import key_index, rows_for
+
+# Result page of a session or medal event: ".../results/<discipline>/<event>/<unit>"
+URL_STAGE_PATTERN = r'/results/([^/]+)/([^/]+)/([^/]+?)/?$'
+
+# Leading characters of a results stage code naming its event; the rest is the unit
+# of the result page, e.g. "ATHM100M--------------FNL-000100--" -> "fnl-000100--"
+EVENT_CODE_LENGTH = 22
+
+# Leading characters of a unit naming its round, e.g. "rnd1" in "rnd1000100--": a page of
+# the whole round ("rnd1--------") links to the results of all its heats
+ROUND_UNIT_LENGTH = 4
+
+
+def slug(names):
+    """
+    URL slugs of names, as used by the result pages ("Men's +92kg" -> "men-s--plus-92kg").
+
+    Accents are dropped and every other character that is not a lowercase letter or
+    a digit becomes a hyphen, without collapsing runs.
+    """
+    folded = names.astype(str).str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+    folded = folded.str.lower().str.replace('+', '-plus-', regex=False).str.replace('&', 'and', regex=False)
+    return folded.str.replace(r'[^a-z0-9]', '-', regex=True)
+
+
+def url_stage_ids(urls):
+    """Stage ids ("<discipline>/<event>/<unit>") of result page URLs, NaN for other pages"""
+    parts = urls.astype(str).str.extract(URL_STAGE_PATTERN)
+    return (parts[0] + '/' + parts[1] + '/' + parts[2].str.lower()).where(urls.notna())
+
+
+def result_stage_ids(stages):
+    """Stage ids of results rows (discipline_name, event_name and stage_code columns)"""
+    units = stages['stage_code'].astype(str).str[EVENT_CODE_LENGTH:].str.lower()
+    return slug(stages['discipline_name']) + '/' + slug(stages['event_name']) + '/' + units
+
+
+def round_ids(stage_ids):
+    """Round ids ("<discipline>/<event>/<round>") of stage ids"""
+    return stage_ids.str.replace(rf'(/[^/]{{{ROUND_UNIT_LENGTH}}})[^/]*$', r'\1', regex=True)
+
+
+def _keys(ids, stage_ids):
+    """Surrogate key of each id (-1 when missing), as int32"""
+    return pd.Categorical(ids, categories=stage_ids).codes.astype(np.int32)
+
+
+def build_stage_keys(schedules, medals, results):
+    """
+    Give every competition stage an integer surrogate key shared by the three tables.
+
+    Schedule sessions (url), medal awards (url_event) and results (discipline, event
+    and stage code) are all reduced to the id of their result page once, so linking
+    them afterwards is a key lookup rather than a string match. A stage without results
+    of its own (a page for a whole round, or a final of several races) falls back to
+    the result stages of its round.
+
+    Returns:
+    - dict with:
+      - 'stages': one row per stage_key with its stage_id, results stage_code and
+        event_code (when it has results), its number of sessions, medals and results,
+        and linked_results (results of the stage, or of its round as a fallback)
+      - 'schedule_keys', 'medal_keys', 'result_keys': stage_key of every row of each
+        table, aligned with its rows (-1 when the row has no result page)
+      - 'schedule_rows', 'medal_rows', 'result_rows': row positions of each stage_key
+      - 'result_links': result stage_keys of each stage_key that reaches results
+    """
+    schedule_ids = url_stage_ids(schedules['url']) if 'url' in schedules.columns else pd.Series(dtype=object)
+    medal_ids = url_stage_ids(medals['url_event']) if 'url_event' in medals.columns else pd.Series(dtype=object)
+
+    result_cols = ['discipline_name', 'event_name', 'stage_code', 'event_code']
+    has_results = not results.empty and all(col in results.columns for col in result_cols)
+    result_stages = results[result_cols].dropna().drop_duplicates('stage_code') if has_results else pd.DataFrame(columns=result_cols)
+    result_stages = result_stages.assign(stage_id=result_stage_ids(result_stages) if has_results else pd.Series(dtype=object))
+
+    stage_ids = pd.Index(pd.concat([schedule_ids, medal_ids, result_stages['stage_id']]).dropna().unique()).sort_values()
+    schedule_keys = _keys(schedule_ids, stage_ids)
+    medal_keys = _keys(medal_ids, stage_ids)
+
+    stage_code_keys = pd.Series(_keys(result_stages['stage_id'], stage_ids), index=result_stages['stage_code'].astype(str))
+    if has_results:
+        result_keys = results['stage_code'].astype(str).map(stage_code_keys).fillna(-1).to_numpy(np.int32)
+    else:
+        result_keys = np.full(len(results), -1, dtype=np.int32)
+
+    stages = pd.DataFrame({'stage_key': np.arange(len(stage_ids), dtype=np.int32), 'stage_id': stage_ids})
+    stages = stages.merge(
+        result_stages.assign(stage_key=stage_code_keys.to_numpy())[['stage_key', 'stage_code', 'event_code']]
+        .drop_duplicates('stage_key'),
+        on='stage_key', how='left'
+    )
+    for column, keys in (('sessions', schedule_keys), ('medals', medal_keys), ('results', result_keys)):
+        stages[column] = np.bincount(keys[keys >= 0], minlength=len(stages)).astype(np.int32)
+
+    stages['round_id'] = round_ids(stages['stage_id'])
+    with_results = stages[stages['results'] > 0]
+    round_stages = with_results.groupby('round_id', sort=False)['stage_key'].agg(list)
+    result_links = {key: [key] for key in with_results['stage_key'].tolist()}
+    fallback = stages[(stages['results'] == 0) & stages['round_id'].isin(round_stages.index)]
+    result_links.update(zip(fallback['stage_key'].tolist(), fallback['round_id'].map(round_stages)))
+    linked_results = pd.Series({key: int(stages['results'].to_numpy()[links].sum()) for key, links in result_links.items()})
+    stages['linked_results'] = stages['stage_key'].map(linked_results).fillna(0).astype(np.int32)
+
+    return {
+        'stages': stages,
+        'schedule_keys': schedule_keys,
+        'medal_keys': medal_keys,
+        'result_keys': result_keys,
+        'schedule_rows': key_index(pd.DataFrame({'stage_key': schedule_keys}), 'stage_key'),
+        'medal_rows': key_index(pd.DataFrame({'stage_key': medal_keys}), 'stage_key'),
+        'result_rows': key_index(pd.DataFrame({'stage_key': result_keys}), 'stage_key'),
+        'result_links': result_links,
+    }
+
+
+def stage_key_of(keys, session):
+    """Stage key of a schedule session (row position in schedules), None when it has no result page"""
+    if session is None or not 0 <= session < len(keys['schedule_keys']):
+        return None
+    key = int(keys['schedule_keys'][session])
+    return key if key >= 0 else None
+
+
+def linked_rows(df, keys, table, stage_key):
+    """
+    Rows of a table ('schedule', 'medal' or 'result') belonging to a stage key.
+
+    Results are those of the stage, or of every heat of its round when the stage has
+    none of its own.
+    """
+    if stage_key is None:
+        return df.iloc[:0]
+    if table == 'result':
+        return rows_for(df, keys['result_rows'], keys['result_links'].get(stage_key, []))
+    return rows_for(df, keys[f'{table}_rows'], stage_key)
+
+
+def linked_event_codes(keys, table):
+    """Results event code of every row of a table ('schedule' or 'medal'), NaN when its stage key reaches no results"""
+    event_codes = keys['stages']['event_code'].to_numpy()
+    event_of = {key: event_codes[links[0]] for key, links in keys['result_links'].items()}
+    return pd.Series(keys[f'{table}_keys']).map(event_of)
+
+
+def stage_start_times(keys, schedules):
+    """
+    Scheduled start of every results stage: the latest session linked to it.
+
+    A session of a whole round links to every unit of the round, and a round can run
+    over several days (Rowing semifinals E/F before the quarterfinals, A/B after), so
+    its last session is the one that places the round among the others.
+
+    Returns:
+    - Series of start times indexed by stage code, for the stages some session reaches
+    """
+    if 'start_date' not in schedules.columns or not keys['result_links']:
+        return pd.Series(dtype=object)
+
+    sessions = pd.DataFrame({'stage_key': keys['schedule_keys'], 'start': schedules['start_date'].to_numpy()})
+    sessions['linked'] = sessions['stage_key'].map(keys['result_links'])
+    sessions = sessions.dropna(subset=['linked', 'start']).explode('linked')
+    starts = sessions.groupby('linked')['start'].max()
+    stage_codes = keys['stages']['stage_code'].to_numpy()
+    return pd.Series(starts.to_numpy(), index=stage_codes[starts.index.to_numpy(dtype=np.int64)].astype(str))
+
+
+def link_coverage(keys):
+    """
+    How many rows of schedules and medals reach result rows through their stage key.
+
+    Returns:
+    - dict {'sessions': (with linked results, total), 'medals': (with linked results, total)}
+    """
+    linked = keys['stages']['linked_results'].to_numpy() > 0
+    coverage = {}
+    for name, table_keys in (('sessions', keys['schedule_keys']), ('medals', keys['medal_keys'])):
+        has_key = table_keys >= 0
+        coverage[name] = (int(linked[table_keys[has_key]].sum()), len(table_keys))
+    return coverage
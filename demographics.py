@@ -0,0 +1,67 @@
+"""
+Demographics module for Olympic Games Dashboard
+Contains the age distribution summaries (box plot statistics, age and age
+group counts) served instead of raw rows to the age charts
+"""
+import pandas as pd
+
+from schemas import AGE_BINS, AGE_LABELS
+
+# Ages kept by the age charts (inclusive), dropping implausible birth dates
+AGE_RANGE = (AGE_BINS[0], AGE_BINS[-1] - 1)
+
+# Box plot statistics of a group, named after the go.Box arguments they feed
+BOX_STATS = ('count', 'mean', 'min', 'lowerfence', 'q1', 'median', 'q3', 'upperfence', 'max')
+
+
+def _box_stats(ages, groups):
+    """Quartiles and Tukey fences (furthest ages within 1.5 IQR of the quartiles) per group"""
+    grouped = ages.groupby(groups, observed=True, sort=True)
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack().set_axis(['q1', 'median', 'q3'], axis=1)
+    stats[['count', 'mean', 'min', 'max']] = grouped.agg(['count', 'mean', 'min', 'max'])
+
+    iqr = stats['q3'] - stats['q1']
+    low = groups.map(stats['q1'] - 1.5 * iqr).astype(float)
+    high = groups.map(stats['q3'] + 1.5 * iqr).astype(float)
+    stats['lowerfence'] = ages.where(ages >= low).groupby(groups, observed=True).min()
+    stats['upperfence'] = ages.where(ages <= high).groupby(groups, observed=True).max()
+    return stats[list(BOX_STATS)]
+
+
+def age_summary(df, by='gender'):
+    """
+    Summarize the ages of a table with age_at_games and age_group columns.
+
+    Parameters:
+    - df: people table (already filtered), see schemas.age_parts()
+    - by: column splitting the box plot statistics, e.g. 'gender'; None for one box
+
+    Returns:
+    - dict of:
+      - 'stats': Series of BOX_STATS over all ages in AGE_RANGE
+      - 'boxes': DataFrame of BOX_STATS, one row per value of `by`
+      - 'ages': Series of people per age
+      - 'groups': Series of people per age group, in AGE_LABELS order
+    """
+    empty = {
+        'stats': pd.Series(0, index=list(BOX_STATS), dtype=float),
+        'boxes': pd.DataFrame(columns=list(BOX_STATS)),
+        'ages': pd.Series(dtype='int64'),
+        'groups': pd.Series(0, index=list(AGE_LABELS), dtype='int64'),
+    }
+    if df.empty or 'age_at_games' not in df.columns:
+        return empty
+
+    kept = df['age_at_games'].between(*AGE_RANGE).fillna(False).to_numpy(dtype=bool)
+    ages = df['age_at_games'][kept].astype(float)
+    if ages.empty:
+        return empty
+
+    everyone = pd.Series('all', index=ages.index)
+    split = df[by][kept].astype(str) if by and by in df.columns else everyone
+    return {
+        'stats': _box_stats(ages, everyone).iloc[0],
+        'boxes': _box_stats(ages, split),
+        'ages': ages.astype('int64').value_counts().sort_index(),
+        'groups': df['age_group'][kept].value_counts().reindex(list(AGE_LABELS), fill_value=0),
+    }
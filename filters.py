@@ -0,0 +1,189 @@
+"""
+Filter engine module for Olympic Games Dashboard
+Contains the compiled sidebar filter spec, the per-table bitmap indexes and
+their application to any table
+"""
+import numpy as np
+import pandas as pd
+
+from data_loader import explode_list_column
+from schemas import MEDAL_FIELDS, MEDAL_TYPES, resolve_columns
+
+# Sidebar selections that filter rows, as logical fields of schemas.FIELD_COLUMNS
+ROW_FILTER_FIELDS = ('country', 'sport', 'continent', 'gender')
+
+# Filter dimensions indexed per table: one bitmap per distinct value. medal_type rows are
+# selected from the spec's medal types rather than from a selection of their own.
+INDEX_FIELDS = ROW_FILTER_FIELDS + ('medal_type',)
+
+# List-literal columns standing for a filter dimension, e.g. athletes.disciplines
+# "['Athletics', 'Swimming']"; a row matches when any of its items is selected
+LIST_FIELD_COLUMNS = {
+    'sport': ('disciplines',),
+}
+
+
+def compile_filters(countries=None, sports=None, continents=None, medal_filters=None, genders=None):
+    """
+    Compile sidebar selections into a canonical, hashable filter spec.
+
+    Values are de-duplicated and sorted and empty selections are dropped, so the
+    same filters always give the same spec, whatever order they were picked in.
+
+    Parameters:
+    - countries, sports, continents, genders: selected values (a list, a single value or "All")
+    - medal_filters: sidebar dict ({'gold': True, ...}) or list (['Gold', 'Total', ...]) of medal types
+
+    Returns:
+    - tuple of (field, values) pairs, e.g. (('country', ('France', 'Japan')), ('medal', ('gold', 'silver')))
+    """
+    selections = {'country': countries, 'sport': sports, 'continent': continents, 'gender': genders}
+    spec = []
+
+    for field in ROW_FILTER_FIELDS:
+        values = selections[field]
+        if isinstance(values, str):
+            values = [values]
+        values = tuple(sorted(set(values or ()) - {"All"}))
+        if values:
+            spec.append((field, values))
+
+    if medal_filters is None:
+        medals = MEDAL_FIELDS
+    elif isinstance(medal_filters, dict):
+        medals = tuple(field for field in MEDAL_FIELDS if medal_filters.get(field, True))
+    else:
+        medals = tuple(field for field in MEDAL_FIELDS + ('total',) if field.capitalize() in medal_filters)
+    spec.append(('medal', medals))
+
+    return tuple(spec)
+
+
+def table_spec(df, spec):
+    """
+    The part of a spec that filters the rows of a table.
+
+    Selections on fields the table does not have are left out, so e.g. a medal type
+    change does not invalidate filtered athletes; an empty tuple means "all rows".
+    Tables with one row per medal keep the rows of the selected medal types.
+    """
+    columns = resolve_columns(df)
+    row_spec = [(field, values) for field, values in spec
+                if field in INDEX_FIELDS and (field in columns or _list_column(df, field))]
+
+    medals = dict(spec).get('medal', MEDAL_FIELDS)
+    if 'medal_type' in columns and 'medal_type' not in dict(spec) and not set(MEDAL_FIELDS) <= set(medals):
+        row_spec.append(('medal_type', tuple(MEDAL_TYPES[field] for field in MEDAL_FIELDS if field in medals)))
+
+    return tuple(row_spec)
+
+
+def _list_column(df, field):
+    return next((col for col in LIST_FIELD_COLUMNS.get(field, ()) if col in df.columns), None)
+
+
+def _field_values(df, field):
+    """
+    Values of a filter dimension with the row position each value belongs to.
+
+    List columns are exploded with the parser of the bridge tables (no regex,
+    nothing evaluated), giving one entry per item.
+
+    Returns:
+    - (values, rows): a Series of values and an array of row positions of the same length
+    """
+    column = resolve_columns(df).get(field)
+    if column is not None:
+        return df[column], np.arange(len(df))
+
+    items = explode_list_column(df[_list_column(df, field)])
+    return items, items.index.get_level_values(0).to_numpy()
+
+
+def _row_mask(rows, length):
+    mask = np.zeros(length, dtype=bool)
+    mask[rows] = True
+    return mask
+
+
+# ==================== BITMAP INDEXES ====================
+def build_index(df):
+    """
+    Precompute the rows of every value of each filter dimension of a table.
+
+    Each value gets a bitmap (one bit per row, packed 8 rows per byte), so applying
+    a filter is a few vectorized ORs and ANDs whatever the size of the table.
+    List columns (LIST_FIELD_COLUMNS) set the bit of a row for each of its items.
+
+    Returns:
+    - dict with the row count ('rows') and {field: {value: bitmap}} ('bitmaps')
+      for the INDEX_FIELDS the table has
+    """
+    columns = resolve_columns(df)
+    bitmaps = {}
+
+    for field in INDEX_FIELDS:
+        if field not in columns and not _list_column(df, field):
+            continue
+        values, rows = _field_values(df, field)
+        codes, uniques = pd.factorize(values)
+        bitmaps[field] = {
+            value: np.packbits(_row_mask(rows[codes == code], len(df))) for code, value in enumerate(uniques)
+        }
+
+    return {'rows': len(df), 'bitmaps': bitmaps}
+
+
+def index_mask(index, spec):
+    """
+    Row mask of a table spec computed from a table's bitmap index.
+
+    Values of a field are OR-ed, fields are AND-ed; values absent from the
+    table match no rows.
+
+    Returns:
+    - boolean array with one entry per row, or None when the spec keeps all rows
+    """
+    bits = None
+    for field, values in spec:
+        bitmaps = index['bitmaps'][field]
+        field_bits = np.zeros((index['rows'] + 7) // 8, dtype=np.uint8)
+        for value in values:
+            if value in bitmaps:
+                np.bitwise_or(field_bits, bitmaps[value], out=field_bits)
+        bits = field_bits if bits is None else np.bitwise_and(bits, field_bits, out=bits)
+
+    if bits is None:
+        return None
+    return np.unpackbits(bits, count=index['rows']).astype(bool)
+
+
+def apply_filters(df, spec, index=None):
+    """
+    Filter the rows of any table with a compiled spec.
+
+    Parameters:
+    - df: table to filter
+    - spec: filter spec from compile_filters() or table_spec()
+    - index: bitmap index of df from build_index(); without one the columns are scanned
+
+    Returns:
+    - the matching rows, or the table itself when no selection applies to it
+    """
+    row_spec = table_spec(df, spec)
+    if index is not None:
+        mask = index_mask(index, row_spec)
+        return df if mask is None else df[mask]
+
+    mask = None
+    for field, selected in row_spec:
+        values, rows = _field_values(df, field)
+        field_mask = _row_mask(rows[values.isin(selected).to_numpy()], len(df))
+        mask = field_mask if mask is None else mask & field_mask
+    return df if mask is None else df[mask]
+
+
+def medal_columns(df, spec):
+    """Medal count columns of a table kept by the spec's medal types, in podium order"""
+    columns = resolve_columns(df)
+    return [columns[field] for field in dict(spec).get('medal', MEDAL_FIELDS) if field in columns]
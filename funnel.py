@@ -0,0 +1,173 @@
+"""
+Funnel module for Olympic Games Dashboard
+Contains the per-country qualification funnel (entries -> semifinal -> final
+-> medal) computed from the event progression index and the medals table
+"""
+import pandas as pd
+
+from data_loader import continent_of
+from progression import PHASE_CODE_LENGTH, ROUND_CODE_START
+
+# Levels of the funnel, from every entry to the podium
+FUNNEL_STAGES = ('entries', 'semifinal', 'final', 'medal')
+
+# Round of the stage code ("SFNL" in "...SFNL000100--") of a semifinal
+SEMIFINAL_ROUND = 'SFNL'
+
+# Stage kind (progression.stage_kinds()) of the final deciding the titles: Final A or the
+# gold medal game, not the placing finals (Rowing Finals B-F) or the bronze contests
+FINAL_STAGE_KIND = 'final'
+
+
+def medal_events(progression, medals, event_codes):
+    """
+    Results event code of every medal award.
+
+    Awards are linked through their stage key; the few whose result page has no
+    result stage fall back to the event of the same discipline and event name.
+
+    Parameters:
+    - progression: index from progression.build_progression_index()
+    - medals: medals table (discipline, event)
+    - event_codes: event code of every medal row from its stage key
+      (competition_keys.linked_event_codes()), NaN when not linked
+    """
+    events = pd.Series(event_codes.to_numpy(), index=medals.index, dtype=object)
+    if events.notna().all() or not {'discipline', 'event'} <= set(medals.columns):
+        return events
+
+    names = progression['entries'].drop_duplicates('event_code')[['event_code', 'discipline_name']].merge(
+        progression['stages'].drop_duplicates('event_code')[['event_code', 'event_name']], on='event_code'
+    ).astype(str)
+    by_name = names.drop_duplicates(['discipline_name', 'event_name']).set_index(['discipline_name', 'event_name'])['event_code']
+    award_names = pd.MultiIndex.from_arrays([medals['discipline'].astype(str), medals['event'].astype(str)])
+    return events.fillna(pd.Series(by_name.reindex(award_names).to_numpy(), index=medals.index))
+
+
+def funnel_participants(progression, nocs, medals, event_codes):
+    """
+    One row per entry (participant in an event) with the funnel levels it reached.
+
+    The levels only apply to events with a semifinal round: straight finals and
+    single-phase events are flagged (semifinal_round False) and reported apart, so
+    they do not pass for semifinals. An entry reached the semifinal when it competed
+    in a main SFNL unit (not a placing semifinal such as Rowing C/D), and the final
+    when it competed in the main final (Final A, gold medal game). Medals are the
+    awards of the medals table matched to the entry's event and participant code.
+    Levels are nested: a medallist counts as a finalist (bronzes are won in bronze
+    contests, or without one in boxing) and a finalist as a semifinalist. Countries get
+    their NOC long name and continent, so the sidebar filters apply.
+
+    Parameters:
+    - progression: index from progression.build_progression_index()
+    - nocs: nocs table (code, country_long), used to name the countries
+    - medals: medals table (code, discipline, event)
+    - event_codes: event code of every medal row, see medal_events()
+
+    Returns:
+    - DataFrame with country_code, country_long, continent, discipline_name, gender,
+      semifinal_round, semifinal and final (booleans) and medal (number of medals won)
+    """
+    columns = ['country_code', 'country_long', 'continent', 'discipline_name', 'gender',
+               'semifinal_round'] + list(FUNNEL_STAGES[1:])
+    entries = progression['entries']
+    if entries.empty:
+        return pd.DataFrame(columns=columns)
+
+    rounds = entries['stage_code'].astype(str).str[ROUND_CODE_START:PHASE_CODE_LENGTH]
+    event_codes_of = entries['event_code'].astype(str)
+    semifinal = (rounds == SEMIFINAL_ROUND) & (entries['stage_kind'] == 'main')
+    reached = pd.DataFrame({
+        'event_code': event_codes_of,
+        'participant_code': entries['participant_code'].astype(str),
+        'semifinal': semifinal,
+        'final': entries['stage_kind'] == FINAL_STAGE_KIND,
+    }).groupby(['event_code', 'participant_code'], sort=False).any()
+    semifinal_events = set(event_codes_of[semifinal])
+
+    rows = entries.drop_duplicates(['event_code', 'participant_code'])
+    keys = pd.MultiIndex.from_arrays([rows['event_code'].astype(str), rows['participant_code'].astype(str)])
+    reached = reached.reindex(keys)
+    semifinal_round = rows['event_code'].astype(str).isin(semifinal_events).to_numpy()
+
+    if medals.empty or 'code' not in medals.columns:
+        won = pd.Series(0, index=keys)
+    else:
+        awards = pd.DataFrame({
+            'event_code': medal_events(progression, medals, event_codes),
+            'participant_code': medals['code'].astype(str),
+        }).dropna()
+        won = awards.value_counts().reindex(keys, fill_value=0)
+    medal = won.to_numpy(dtype='int32')
+    final = semifinal_round & (reached['final'].to_numpy(dtype=bool) | (medal > 0))
+
+    codes = rows['participant_country_code'].astype(str)
+    if {'code', 'country_long'} <= set(nocs.columns):
+        names = codes.map(nocs.drop_duplicates('code').set_index('code')['country_long'].astype(str))
+    else:
+        names = pd.Series(index=rows.index, dtype=object)
+
+    return pd.DataFrame({
+        'country_code': rows['participant_country_code'].to_numpy(),
+        'country_long': names.fillna(rows['participant_country'].astype(str)).astype('category').to_numpy(),
+        'continent': continent_of(codes).to_numpy(),
+        'discipline_name': rows['discipline_name'].to_numpy(),
+        'gender': rows['gender'].to_numpy(),
+        'semifinal_round': semifinal_round,
+        'semifinal': (semifinal_round & reached['semifinal'].to_numpy(dtype=bool)) | final,
+        'final': final,
+        'medal': medal,
+    })[columns]
+
+
+def medal_mismatches(participants, medals):
+    """
+    Disciplines whose funnel medal total differs from the medals table.
+
+    Returns:
+    - DataFrame with discipline_name, funnel_medals and medals, empty when every
+      discipline matches
+    """
+    columns = ['discipline_name', 'funnel_medals', 'medals']
+    if 'discipline' not in medals.columns:
+        return pd.DataFrame(columns=columns)
+
+    totals = pd.DataFrame({
+        'funnel_medals': participants.groupby(participants['discipline_name'].astype(str))['medal'].sum(),
+        'medals': medals.groupby(medals['discipline'].astype(str)).size(),
+    }).fillna(0).astype('int32')
+    totals = totals[totals['funnel_medals'] != totals['medals']]
+    return totals.rename_axis('discipline_name').reset_index()[columns]
+
+
+def qualification_funnel(participants):
+    """
+    Count the entries of each country reaching every funnel level, in one grouped pass.
+
+    Only entries of events with a semifinal round go through the funnel; the others
+    are counted apart (no_semifinal_round), with their medals left out of the funnel.
+
+    Returns:
+    - DataFrame with country_code, country_long, one count column per FUNNEL_STAGES
+      level, the conversion rate from each level to the next (semifinal_rate,
+      final_rate, medal_rate) and no_semifinal_round, sorted by entries
+    """
+    levels = list(FUNNEL_STAGES[1:])
+    columns = (['country_code', 'country_long'] + list(FUNNEL_STAGES) + [f'{level}_rate' for level in levels]
+               + ['no_semifinal_round'])
+    if participants.empty:
+        return pd.DataFrame(columns=columns)
+
+    grouped = participants.groupby(['country_code', 'country_long'], observed=True, sort=False)
+    in_funnel = participants['semifinal_round'].to_numpy(dtype=bool)
+    funnel = participants[levels].mul(in_funnel, axis=0).groupby(
+        [participants['country_code'], participants['country_long']], observed=True, sort=False
+    ).sum().astype('int32')
+    funnel.insert(0, 'entries', grouped['semifinal_round'].sum().astype('int32'))
+    funnel['no_semifinal_round'] = (grouped.size() - funnel['entries']).astype('int32')
+
+    for previous, level in zip(FUNNEL_STAGES, levels):
+        funnel[f'{level}_rate'] = funnel[level] / funnel[previous].where(funnel[previous] > 0)
+
+    funnel = funnel.reset_index()[columns]
+    return funnel.sort_values(['entries', 'medal'], ascending=False, ignore_index=True)
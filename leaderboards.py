@@ -0,0 +1,107 @@
+"""
+Leaderboard module for Olympic Games Dashboard
+Contains the "top N by medals" rankings computed from the per-medal tables
+(medallists, medals) and the medal hierarchies behind the sunburst, treemap
+and continent charts
+"""
+import pandas as pd
+
+from schemas import MEDAL_FIELDS, MEDAL_TYPES, resolve_columns
+
+# Ranking dimensions, as logical fields or columns of the per-medal tables:
+# - key: column identifying a ranked entity
+# - label: column shown for it (first value seen per key)
+# - attributes: extra logical fields attached to each row (first value seen per key)
+LEADERBOARD_KEYS = {
+    'athlete': {'key': 'code_athlete', 'label': 'name', 'attributes': ('country',)},
+    'country': {'key': 'country_code', 'label': 'country', 'attributes': ()},
+    'discipline': {'key': 'discipline', 'label': 'discipline', 'attributes': ()},
+    'team': {'key': 'code_team', 'label': 'team', 'attributes': ('country', 'discipline')},
+}
+
+# Columns a medal is identified by: one medal per entity, event and type, so a team
+# medal counts once for its country or team even though every member has a row
+MEDAL_IDENTITY = ('discipline', 'event', 'medal_type')
+
+# Medal count columns of a leaderboard, in podium order
+LEADERBOARD_MEDALS = tuple(field.capitalize() for field in MEDAL_FIELDS)
+
+
+def _column(df, name):
+    """Physical column of a logical field, or the name itself when it is a column"""
+    return resolve_columns(df).get(name, name)
+
+
+def medal_leaderboard(df, by='athlete'):
+    """
+    Rank the entities of a per-medal table by medal count in one grouped pass.
+
+    Parameters:
+    - df: medallists or medals rows (already filtered), with a medal_type column
+    - by: ranking dimension in LEADERBOARD_KEYS
+
+    Returns:
+    - DataFrame with the key, label and attribute columns followed by Gold, Silver,
+      Bronze and Total, sorted by Total then Gold, Silver and Bronze
+    """
+    spec = LEADERBOARD_KEYS[by]
+    key = spec['key']
+    info_cols = list(dict.fromkeys(_column(df, field) for field in (spec['label'],) + spec['attributes']))
+    info_cols = [col for col in info_cols if col in df.columns and col != key]
+    columns = [key] + info_cols + list(LEADERBOARD_MEDALS) + ['Total']
+
+    if df.empty or key not in df.columns or 'medal_type' not in df.columns:
+        return pd.DataFrame(columns=columns)
+
+    medals = df.dropna(subset=[key])
+    medals = medals.drop_duplicates(subset=[key] + [col for col in MEDAL_IDENTITY if col in medals.columns])
+
+    counts = pd.crosstab(medals[key], medals['medal_type'].astype(str).str.strip())
+    counts = counts.reindex(columns=[MEDAL_TYPES[field] for field in MEDAL_FIELDS], fill_value=0)
+    counts.columns = list(LEADERBOARD_MEDALS)
+    counts['Total'] = counts.sum(axis=1)
+
+    if info_cols:
+        info = medals.groupby(key, observed=True, sort=False)[info_cols].first()
+        counts = counts.join(info)
+
+    board = counts.reset_index()[columns]
+    return board.sort_values(['Total'] + list(LEADERBOARD_MEDALS), ascending=False, ignore_index=True)
+
+
+# ==================== HIERARCHIES ====================
+def medal_hierarchy(df, levels, medals=MEDAL_FIELDS):
+    """
+    Long-format medal counts of a medal count table (medals_total) for a list of levels.
+
+    The medal count columns are melted into a medal_type level ('Gold', 'Silver',
+    'Bronze') and summed per path in one groupby, e.g. levels ('continent', 'country',
+    'medal_type') give one row per continent, country and medal type.
+
+    Parameters:
+    - df: table with one medal count column per medal type
+    - levels: logical fields or columns of df, and/or 'medal_type'
+    - medals: medal fields counted, in podium order
+
+    Returns:
+    - DataFrame with one column per level (named after the level, as plain strings
+      since plotly cannot aggregate categorical path columns) and 'count', without empty nodes
+    """
+    columns = resolve_columns(df)
+    group_levels = [level for level in levels if level != 'medal_type']
+    level_cols = [_column(df, level) for level in group_levels]
+    value_cols = {columns[field]: field.capitalize() for field in MEDAL_FIELDS if field in medals and field in columns}
+
+    if df.empty or not value_cols or any(col not in df.columns for col in level_cols):
+        return pd.DataFrame(columns=list(levels) + ['count'])
+
+    frame = df[level_cols + list(value_cols)].set_axis(group_levels + list(value_cols.values()), axis=1)
+    frame = frame.astype({level: str for level in group_levels})
+    long = frame.melt(id_vars=group_levels, var_name='medal_type', value_name='count')
+    return rollup(long, levels)
+
+
+def rollup(hierarchy, levels):
+    """Sum a medal hierarchy up to coarser levels, e.g. continent x country x medal type -> continent"""
+    grouped = hierarchy.groupby(list(levels), observed=True, sort=False)['count'].sum().reset_index()
+    return grouped[grouped['count'] > 0].reset_index(drop=True)
@@ -0,0 +1,67 @@
+"""
+Medal cube module for Olympic Games Dashboard
+Contains the medal counts of medals.csv pre-aggregated over every filter
+dimension, and the rollups served from it
+"""
+import pandas as pd
+
+from data_loader import continent_of
+from schemas import MEDAL_FIELDS, MEDAL_TYPES
+
+# Dimensions of the cube: medals.csv columns plus the continent of each country
+CUBE_DIMENSIONS = ('country_code', 'country', 'country_long', 'continent', 'discipline', 'event', 'gender',
+                   'medal_date', 'medal_type')
+
+# Grain of a rollup shaped like medals_total.csv, one row per country
+COUNTRY_GRAIN = ('country_code', 'country', 'country_long', 'continent')
+
+# Medal count columns of a rollup, named like medals_total.csv, in podium order
+MEDAL_COUNT_COLUMNS = tuple(MEDAL_TYPES[field] for field in MEDAL_FIELDS)
+
+
+def build_cube(medals):
+    """
+    Aggregate the medals table (one row per medal) over all cube dimensions.
+
+    Returns:
+    - DataFrame with the CUBE_DIMENSIONS found in the table and 'count', one row
+      per distinct combination; filtering it and summing 'count' gives medal
+      counts at any grain
+    """
+    if medals.empty or 'medal_type' not in medals.columns:
+        return pd.DataFrame(columns=list(CUBE_DIMENSIONS) + ['count'])
+
+    if 'country_code' in medals.columns:
+        medals = medals.assign(continent=continent_of(medals['country_code']))
+
+    dimensions = [col for col in CUBE_DIMENSIONS if col in medals.columns]
+    cube = medals.groupby(dimensions, observed=True, dropna=False).size().rename('count').reset_index()
+    cube['count'] = cube['count'].astype('int32')
+    return cube
+
+
+def cube_rollup(cube, grain=COUNTRY_GRAIN):
+    """
+    Medal counts of (filtered) cube rows at a grain, one column per medal type.
+
+    Parameters:
+    - cube: rows of build_cube(), e.g. narrowed with filters.apply_filters()
+    - grain: cube dimensions kept, COUNTRY_GRAIN gives the shape of medals_total.csv
+
+    Returns:
+    - DataFrame with the grain columns, Gold Medal, Silver Medal, Bronze Medal and Total,
+      ranked by gold, silver then bronze medals
+    """
+    grain = [col for col in grain if col in cube.columns and col != 'medal_type']
+    columns = grain + list(MEDAL_COUNT_COLUMNS) + ['Total']
+    if cube.empty:
+        return pd.DataFrame(columns=columns)
+
+    counts = cube.groupby(grain + ['medal_type'], observed=True, dropna=False)['count'].sum()
+    counts = counts.unstack('medal_type', fill_value=0)
+    counts.columns = counts.columns.astype(str)
+    counts = counts.reindex(columns=list(MEDAL_COUNT_COLUMNS), fill_value=0)
+    counts['Total'] = counts.sum(axis=1)
+
+    rollup = counts.reset_index()[columns].rename_axis(columns=None)
+    return rollup.sort_values(list(MEDAL_COUNT_COLUMNS), ascending=False, ignore_index=True)
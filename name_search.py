@@ -0,0 +1,159 @@
+"""
+Name search module for Olympic Games Dashboard
+Contains the server-side name index behind the athlete search box: sorted
+token prefixes plus trigram fuzzy matching, on accent-folded names
+"""
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# Matches returned by a search when no limit is given
+SEARCH_LIMIT = 20
+
+# Minimum trigram similarity (Jaccard) of a fuzzy match
+FUZZY_THRESHOLD = 0.3
+
+# Combining marks removed by accent folding, after NFKD decomposition
+COMBINING_MARKS = '[\u0300-\u036f]'
+
+
+def fold(text):
+    """Accent- and case-folded form of a name or query ("Léon MARCHAND" -> "leon marchand")"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def _fold_series(names):
+    return names.str.normalize('NFKD').str.replace(COMBINING_MARKS, '', regex=True).str.casefold()
+
+
+def _tokens(folded):
+    return [token for token in folded.replace("'", ' ').replace('-', ' ').split() if token]
+
+
+def _trigrams(folded):
+    padded = f"  {folded} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def build_name_index(names, keys=None):
+    """
+    Index distinct names, or the names of distinct keys, for prefix and fuzzy search.
+
+    Parameters:
+    - names: Series of names (missing values are ignored)
+    - keys: optional Series of keys aligned with names (e.g. athlete codes); entries are
+      then distinct keys, so two athletes sharing a name stay two entries. Without keys,
+      duplicate names are ignored and each name is its own key
+
+    Returns:
+    - dict with the names in folded alphabetical order ('names') and their keys ('keys'),
+      the sorted token prefix array ('tokens', 'token_ids'), the trigram postings
+      ('trigrams') and the trigram count of each name ('trigram_counts')
+    """
+    names = pd.Series(names).reset_index(drop=True)
+    keys = names if keys is None else pd.Series(keys).reset_index(drop=True)
+    entries = pd.DataFrame({'key': keys, 'name': names}).dropna().drop_duplicates('key')
+    names = entries['name'].astype(str)
+    folded = _fold_series(names)
+    order = np.argsort(folded.to_numpy(), kind='stable')
+    keys = entries['key'].to_numpy()[order]
+    names = names.to_numpy()[order]
+    folded = folded.to_numpy()[order]
+
+    name_tokens = [_tokens(key) for key in folded]
+    token_ids = np.repeat(np.arange(len(names)), [len(tokens) for tokens in name_tokens])
+    tokens = np.array([token for tokens in name_tokens for token in tokens], dtype=object)
+    token_order = np.argsort(tokens, kind='stable')
+
+    postings = {}
+    trigram_counts = np.zeros(len(names), dtype=np.int32)
+    for name_id, key in enumerate(folded):
+        grams = _trigrams(key)
+        trigram_counts[name_id] = len(grams)
+        for gram in grams:
+            postings.setdefault(gram, []).append(name_id)
+
+    return {
+        'names': names,
+        'keys': keys,
+        'tokens': tokens[token_order],
+        'token_ids': token_ids[token_order],
+        'trigrams': {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()},
+        'trigram_counts': trigram_counts,
+    }
+
+
+def _prefix_ids(index, prefix):
+    start = np.searchsorted(index['tokens'], prefix, side='left')
+    end = np.searchsorted(index['tokens'], prefix + '\uffff', side='left')
+    return np.unique(index['token_ids'][start:end])
+
+
+def _fuzzy_ids(index, folded):
+    grams = [gram for gram in _trigrams(folded) if gram in index['trigrams']]
+    if not grams:
+        return np.array([], dtype=np.int32)
+
+    shared = np.bincount(np.concatenate([index['trigrams'][gram] for gram in grams]),
+                         minlength=len(index['names']))
+    similarity = shared / (len(_trigrams(folded)) + index['trigram_counts'] - shared)
+    candidates = np.flatnonzero(similarity >= FUZZY_THRESHOLD)
+    return candidates[np.argsort(-similarity[candidates], kind='stable')]
+
+
+def _search_ids(index, query, limit, allowed):
+    """Positions in the index of the entries matching a query, best matches first"""
+    folded = fold(query or '').strip()
+    words = _tokens(folded)
+
+    if words:
+        prefix = _prefix_ids(index, words[0])
+        for word in words[1:]:
+            prefix = np.intersect1d(prefix, _prefix_ids(index, word), assume_unique=True)
+    else:
+        prefix = np.arange(len(index['names']))
+
+    if allowed is not None:
+        prefix = prefix[allowed[prefix]]
+
+    ids = list(prefix[:limit])
+    if words and len(ids) < limit:
+        seen = set(ids)
+        fuzzy = _fuzzy_ids(index, folded)
+        if allowed is not None:
+            fuzzy = fuzzy[allowed[fuzzy]]
+        ids += [name_id for name_id in fuzzy if name_id not in seen][:limit - len(ids)]
+
+    return ids
+
+
+def search_names(index, query, limit=SEARCH_LIMIT, allowed=None):
+    """
+    Names matching a search query, best matches first.
+
+    Names where every query word starts a word of the name come first, in
+    alphabetical order; trigram (typo-tolerant) matches fill the remaining slots.
+    Matching ignores case and accents.
+
+    Parameters:
+    - index: name index from build_name_index()
+    - query: text typed by the user; an empty query lists names alphabetically
+    - limit: maximum number of names returned
+    - allowed: optional boolean array over index['names'] restricting the matches
+
+    Returns:
+    - list of at most `limit` names
+    """
+    return [index['names'][name_id] for name_id in _search_ids(index, query, limit, allowed)]
+
+
+def search_keys(index, query, limit=SEARCH_LIMIT, allowed=None):
+    """
+    Keys of the names matching a search query, best matches first (see search_names()).
+
+    Returns:
+    - list of at most `limit` keys, one per matching entry even when names repeat
+    """
+    return [index['keys'][name_id] for name_id in _search_ids(index, query, limit, allowed)]
@@ -5,7 +5,7 @@ import plotly.express as px
 from datetime import datetime
 
 # Import styling
-from app import get_theme_css, render_sidebar, render_theme_toggle, filter_medals_data, filter_athletes_data, filter_events_data
+from app import get_theme_css, render_sidebar, render_theme_toggle, load_tables, filter_tables, compile_filters, medal_columns, medal_counts, resolve_columns, MEDAL_FIELDS
 
 # Page configuration
 st.set_page_config(
@@ -13,12 +13,11 @@ st.set_page_config(
     layout="wide"
 )
 
-# Load data from main app
-if "data" not in st.session_state:
-    st.info("Please go to the main page first to load data")
-    st.stop()
+# Tables used by this page
+PAGE_TABLES = ('athletes', 'nocs', 'events', 'medals')
 
-data = st.session_state.get("data", {})
+with st.spinner("Loading data..."):
+    data = load_tables(PAGE_TABLES)
 
 # Initialize theme
 if "theme" not in st.session_state:
@@ -34,7 +33,6 @@ st.markdown(get_theme_css(current_theme, animated=animate_header), unsafe_allow_
 render_theme_toggle()
 
 # Sidebar filters
-data = st.session_state.get("data", {})
 selected_countries, selected_sports, selected_continent, medal_filters = render_sidebar(active_page="overview", data=data)
 st.session_state['selected_countries'] = selected_countries
 st.session_state['selected_sports'] = selected_sports
@@ -63,45 +61,24 @@ st.markdown("""
 athletes_data = data.get('athletes', pd.DataFrame())
 nocs_data = data.get('nocs', pd.DataFrame())
 events_data = data.get('events', pd.DataFrame())
-medals_total_data = data.get('medals_total', pd.DataFrame())
-
-# Apply filters using imported functions
-filtered_athletes = filter_athletes_data(
-    athletes_data,
-    selected_countries,
-    selected_sports,
-    selected_continent
-)
-
-filtered_nocs = nocs_data.copy()
-if not filtered_nocs.empty and selected_countries:
-    if 'country' in filtered_nocs.columns:
-        filtered_nocs = filtered_nocs[filtered_nocs['country'].isin(selected_countries)]
 
-filtered_events = filter_events_data(
-    events_data,
-    selected_sports,
-    selected_countries
-)
+# Apply the sidebar filters (memoized per table and filter spec)
+spec = compile_filters(selected_countries, selected_sports, selected_continent, medal_filters)
+filtered = filter_tables(data, spec)
+filtered_athletes = filtered.get('athletes', athletes_data)
+filtered_nocs = filtered.get('nocs', nocs_data)
+filtered_events = filtered.get('events', events_data)
+# Medals per country from the medal cube, so sport filters apply to medal counts too
+filtered_medals = medal_counts(spec)
+medal_cols = medal_columns(filtered_medals, spec)
 
-# Convert medal_filters dict to list for compatibility
-medal_filter_list = []
-if isinstance(medal_filters, dict):
-    if medal_filters.get('gold', True):
-        medal_filter_list.append('Gold')
-    if medal_filters.get('silver', True):
-        medal_filter_list.append('Silver')
-    if medal_filters.get('bronze', True):
-        medal_filter_list.append('Bronze')
-else:
-    medal_filter_list = medal_filters
+# Physical column of each medal type kept by the sidebar, e.g. {'gold': 'Gold Medal'}
+medal_table_columns = resolve_columns(filtered_medals)
+selected_medal_cols = {field: medal_table_columns[field] for field in MEDAL_FIELDS if medal_table_columns.get(field) in medal_cols}
 
-filtered_medals, medal_cols = filter_medals_data(
-    medals_total_data,
-    medal_filter_list,
-    selected_countries,
-    selected_continent
-)
+def medal_count(frame, field):
+    """Medal counts of one type, or 0 when that type is filtered out"""
+    return frame[selected_medal_cols[field]] if field in selected_medal_cols else 0
 
 # Calculate KPIs
 col1, col2, col3, col4, col5 = st.columns(5)
@@ -168,16 +145,10 @@ with col1:
     # Pie/Donut chart of medal types
     if not filtered_medals.empty and medal_cols:
         # Calculate medal totals
-        gold_total = silver_total = bronze_total = 0
-        
-        for col in medal_cols:
-            col_lower = col.lower()
-            if 'gold' in col_lower:
-                gold_total += filtered_medals[col].sum()
-            elif 'silver' in col_lower:
-                silver_total += filtered_medals[col].sum()
-            elif 'bronze' in col_lower:
-                bronze_total += filtered_medals[col].sum()
+        gold_total, silver_total, bronze_total = (
+            int(filtered_medals[selected_medal_cols[field]].sum()) if field in selected_medal_cols else 0
+            for field in MEDAL_FIELDS
+        )
         
         # Create the chart
         fig = go.Figure(data=[go.Pie(
@@ -213,16 +184,10 @@ with col2:
     """, unsafe_allow_html=True)
     
     if not filtered_medals.empty and medal_cols:
-        gold_total = silver_total = bronze_total = 0
-        
-        for col in medal_cols:
-            col_lower = col.lower()
-            if 'gold' in col_lower:
-                gold_total += int(filtered_medals[col].sum())
-            elif 'silver' in col_lower:
-                silver_total += int(filtered_medals[col].sum())
-            elif 'bronze' in col_lower:
-                bronze_total += int(filtered_medals[col].sum())
+        gold_total, silver_total, bronze_total = (
+            int(filtered_medals[selected_medal_cols[field]].sum()) if field in selected_medal_cols else 0
+            for field in MEDAL_FIELDS
+        )
         
         total_all = gold_total + silver_total + bronze_total
         
@@ -252,9 +217,7 @@ if not filtered_medals.empty and medal_cols:
     filtered_medals_copy = filtered_medals.copy()
     
     # Determine country column
-    country_col = 'country_long' if 'country_long' in filtered_medals_copy.columns else 'country'
-    if country_col not in filtered_medals_copy.columns and len(filtered_medals_copy.columns) > 0:
-        country_col = filtered_medals_copy.columns[0]
+    country_col = medal_table_columns.get('country', filtered_medals_copy.columns[0])
     
     # Calculate total medals for each country
     filtered_medals_copy['total_medals'] = filtered_medals_copy[medal_cols].sum(axis=1)
@@ -263,30 +226,15 @@ if not filtered_medals.empty and medal_cols:
     top_10 = filtered_medals_copy.nlargest(10, 'total_medals')
     
     # Prepare data for visualization
-    plot_data = []
-    for _, row in top_10.iterrows():
-        country = row[country_col]
-        gold = silver = bronze = 0
-        
-        for col in medal_cols:
-            col_lower = col.lower()
-            if 'gold' in col_lower:
-                gold += row[col]
-            elif 'silver' in col_lower:
-                silver += row[col]
-            elif 'bronze' in col_lower:
-                bronze += row[col]
-        
-        plot_data.append({
-            'Country': country,
-            '🥇 Gold': gold,
-            '🥈 Silver': silver,
-            '🥉 Bronze': bronze,
-            'Total': gold + silver + bronze
-        })
+    plot_df = pd.DataFrame({
+        'Country': top_10[country_col].astype(str),
+        '🥇 Gold': medal_count(top_10, 'gold'),
+        '🥈 Silver': medal_count(top_10, 'silver'),
+        '🥉 Bronze': medal_count(top_10, 'bronze'),
+    }).reset_index(drop=True)
+    plot_df['Total'] = plot_df['🥇 Gold'] + plot_df['🥈 Silver'] + plot_df['🥉 Bronze']
     
-    if plot_data:
-        plot_df = pd.DataFrame(plot_data)
+    if not plot_df.empty:
         
         # Create horizontal bar chart
         fig = go.Figure()
@@ -357,7 +305,8 @@ with col1:
     if not filtered_athletes.empty:
         st.markdown("### 🏃 Athletes Distribution")
         if 'country_long' in filtered_athletes.columns:
-            athletes_by_country = filtered_athletes['country_long'].value_counts().head(10)
+            athletes_by_country = filtered_athletes['country_long'].value_counts()
+            athletes_by_country = athletes_by_country[athletes_by_country > 0].head(10)
             
             fig = px.bar(
                 x=athletes_by_country.values,
@@ -383,7 +332,8 @@ with col2:
     # Events per sport (top 10)
     if not filtered_events.empty and 'sport' in filtered_events.columns:
         st.markdown("### ⚽ Sports Event Distribution")
-        events_by_sport = filtered_events['sport'].value_counts().head(10)
+        events_by_sport = filtered_events['sport'].value_counts()
+        events_by_sport = events_by_sport[events_by_sport > 0].head(10)
         
         fig = px.pie(
             values=events_by_sport.values,
@@ -425,9 +375,10 @@ with summary_col1:
         </div>
         """, unsafe_allow_html=True)
         
-        gold_total = medal_totals[[col for col in medal_totals.index if 'gold' in col.lower()]].sum()
-        silver_total = medal_totals[[col for col in medal_totals.index if 'silver' in col.lower()]].sum()
-        bronze_total = medal_totals[[col for col in medal_totals.index if 'bronze' in col.lower()]].sum()
+        gold_total, silver_total, bronze_total = (
+            medal_totals[selected_medal_cols[field]] if field in selected_medal_cols else 0
+            for field in MEDAL_FIELDS
+        )
         
         st.markdown(f"""
         <div style="padding: 15px; background: rgba(255,215,0,0.05); border-radius: 10px; margin-bottom: 10px;">
@@ -444,8 +395,9 @@ with summary_col1:
 with summary_col2:
     st.markdown("### 🌍 Geographic Coverage")
     if not filtered_athletes.empty:
-        unique_countries = filtered_athletes['country_long'].nunique() if 'country_long' in filtered_athletes.columns else 0
-        unique_sports = filtered_athletes['sport'].nunique() if 'sport' in filtered_athletes.columns else 0
+        athlete_columns = resolve_columns(filtered_athletes)
+        unique_countries = filtered_athletes[athlete_columns['country']].nunique() if 'country' in athlete_columns else 0
+        unique_sports = filtered_athletes[athlete_columns['sport']].nunique() if 'sport' in athlete_columns else 0
         
         st.markdown(f"""
         <div style="padding: 15px; background: rgba(0,159,61,0.05); border-radius: 10px; margin-bottom: 10px;">
@@ -482,7 +434,8 @@ with summary_col3:
     
     if not filtered_events.empty:
         events_count = len(filtered_events)
-        sports_count = filtered_events['sport'].nunique() if 'sport' in filtered_events.columns else 0
+        events_sport_col = resolve_columns(filtered_events).get('sport')
+        sports_count = filtered_events[events_sport_col].nunique() if events_sport_col else 0
         
         if sports_count > 0:
             events_per_sport = events_count / sports_count
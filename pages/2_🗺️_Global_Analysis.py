@@ -3,7 +3,7 @@ import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px  # Add this import
 from datetime import datetime
-from app import get_theme_css, render_sidebar, render_theme_toggle
+from app import get_theme_css, render_sidebar, render_theme_toggle, load_tables, compile_filters, medal_breakdown, medal_counts, rollup, resolve_columns, country_funnel, funnel_medal_check, MEDAL_FIELDS, FUNNEL_STAGES
 
 # Page configuration
 st.set_page_config(
@@ -11,6 +11,9 @@ st.set_page_config(
     layout="wide"
 )
 
+# Tables used by this page
+PAGE_TABLES = ('medals',)
+
 # Initialize theme
 if "theme" not in st.session_state:
     st.session_state["theme"] = "light"
@@ -26,7 +29,8 @@ st.markdown(get_theme_css(current_theme, animated=animate_header), unsafe_allow_
 # Theme toggle at top right - ONLY ONCE
 render_theme_toggle()
 
-data = st.session_state.get("data", {})
+with st.spinner("Loading data..."):
+    data = load_tables(PAGE_TABLES)
 
 # Sidebar filters
 selected_countries, selected_sports, selected_continent, medal_filters = render_sidebar(active_page="global", data=data)
@@ -46,18 +50,15 @@ st.markdown(f"""
     </div>
 """, unsafe_allow_html=True)
 
-# Get filtered data
-medals_total_data = data.get('medals_total', pd.DataFrame())
-nocs_data = data.get('nocs', pd.DataFrame())
+# Medals per country under the sidebar filters, served from the medal cube
+spec = compile_filters(selected_countries, selected_sports, selected_continent, medal_filters)
+filtered_medals = medal_counts(spec)
 
-# Apply filters
-filtered_medals = medals_total_data.copy()
-if selected_countries:
-    if 'country_long' in filtered_medals.columns:
-        filtered_medals = filtered_medals[filtered_medals['country_long'].isin(selected_countries)]
-if selected_continent:
-    if 'continent' in filtered_medals.columns:
-        filtered_medals = filtered_medals[filtered_medals['continent'].isin(selected_continent)]
+# Physical columns of the medal table, resolved once
+columns = resolve_columns(filtered_medals)
+country_col = columns.get('country')
+medal_cols = [columns[field] for field in MEDAL_FIELDS if field in columns]
+gold_col, silver_col, bronze_col = (columns.get(field) for field in MEDAL_FIELDS)
 
 # --- World Medal Map (Choropleth) ---
 st.markdown("""
@@ -68,20 +69,17 @@ st.markdown("""
 
 if not filtered_medals.empty:
     # Prepare data for choropleth
-    if 'country_long' in filtered_medals.columns and 'country_code' in filtered_medals.columns:
+    if country_col and 'country_code' in columns:
         # Calculate total medals
-        medal_cols = ['Gold Medal', 'Silver Medal', 'Bronze Medal'] if 'Gold Medal' in filtered_medals.columns else ['gold', 'silver', 'bronze']
-        medal_cols = [col for col in medal_cols if col in filtered_medals.columns]
-        
         if medal_cols:
             filtered_medals['total_medals'] = filtered_medals[medal_cols].sum(axis=1)
             
             # Create choropleth
             fig = px.choropleth(
                 filtered_medals,
-                locations='country_code',
+                locations=columns['country_code'],
                 color='total_medals',
-                hover_name='country_long',
+                hover_name=country_col,
                 color_continuous_scale=px.colors.sequential.Plasma,
                 title='<b>World Medal Distribution</b>',
                 projection='natural earth',
@@ -112,49 +110,21 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# Continent → country → medal type counts, computed once per filter spec and rolled
+# up for the treemap and the continent bar chart
+medal_hierarchy = pd.DataFrame()
+if 'continent' in columns and country_col:
+    medal_hierarchy = medal_breakdown(spec, ('continent', 'country', 'medal_type'))
+
 col1, col2 = st.columns(2)
 
 with col1:
     # Sunburst chart
     st.markdown("#### 🔄 Sunburst Chart")
-    if not filtered_medals.empty and 'continent' in filtered_medals.columns and 'country_long' in filtered_medals.columns:
-        # For sunburst, we need Continent -> Country -> Medal Type
-        # Prepare hierarchical data
-        hierarchical_data = []
-        for _, row in filtered_medals.iterrows():
-            continent = row.get('continent', 'Unknown')
-            country = row.get('country_long', 'Unknown')
-            
-            gold_col = 'Gold Medal' if 'Gold Medal' in row else 'gold'
-            silver_col = 'Silver Medal' if 'Silver Medal' in row else 'silver'
-            bronze_col = 'Bronze Medal' if 'Bronze Medal' in row else 'bronze'
-            
-            if gold_col in row and row[gold_col] > 0:
-                hierarchical_data.append({
-                    'continent': continent,
-                    'country': country,
-                    'medal_type': 'Gold',
-                    'count': row[gold_col]
-                })
-            if silver_col in row and row[silver_col] > 0:
-                hierarchical_data.append({
-                    'continent': continent,
-                    'country': country,
-                    'medal_type': 'Silver',
-                    'count': row[silver_col]
-                })
-            if bronze_col in row and row[bronze_col] > 0:
-                hierarchical_data.append({
-                    'continent': continent,
-                    'country': country,
-                    'medal_type': 'Bronze',
-                    'count': row[bronze_col]
-                })
-        
-        if hierarchical_data:
-            df_hierarchical = pd.DataFrame(hierarchical_data)
+    if not filtered_medals.empty and 'continent' in columns and country_col:
+        if not medal_hierarchy.empty:
             fig = px.sunburst(
-                df_hierarchical,
+                medal_hierarchy,
                 path=['continent', 'country', 'medal_type'],
                 values='count',
                 color='continent',
@@ -170,24 +140,15 @@ with col1:
 with col2:
     # Treemap
     st.markdown("#### 📊 Treemap Chart")
-    if not filtered_medals.empty and 'continent' in filtered_medals.columns:
-        # Group by continent for treemap
-        continent_summary = filtered_medals.groupby('continent').agg({
-            'Gold Medal': 'sum' if 'Gold Medal' in filtered_medals.columns else None,
-            'Silver Medal': 'sum' if 'Silver Medal' in filtered_medals.columns else None,
-            'Bronze Medal': 'sum' if 'Bronze Medal' in filtered_medals.columns else None
-        }).reset_index()
-        
-        # Calculate total medals per continent
-        medal_cols = [col for col in ['Gold Medal', 'Silver Medal', 'Bronze Medal'] if col in continent_summary.columns]
-        if medal_cols:
-            continent_summary['total'] = continent_summary[medal_cols].sum(axis=1)
+    if not filtered_medals.empty and 'continent' in columns:
+        if not medal_hierarchy.empty:
+            continent_summary = rollup(medal_hierarchy, ['continent'])
             
             fig = px.treemap(
                 continent_summary,
                 path=['continent'],
-                values='total',
-                color='total',
+                values='count',
+                color='count',
                 color_continuous_scale='RdYlBu',
                 title='<b>Medal Distribution by Continent</b>'
             )
@@ -207,46 +168,24 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-if not filtered_medals.empty and 'continent' in filtered_medals.columns:
-    # Group by continent and sum medals
-    continent_medals = filtered_medals.groupby('continent').agg({
-        'Gold Medal': 'sum' if 'Gold Medal' in filtered_medals.columns else None,
-        'Silver Medal': 'sum' if 'Silver Medal' in filtered_medals.columns else None,
-        'Bronze Medal': 'sum' if 'Bronze Medal' in filtered_medals.columns else None
-    }).reset_index()
-    
-    # Rename columns if using lowercase
-    if 'gold' in filtered_medals.columns:
-        continent_medals = filtered_medals.groupby('continent').agg({
-            'gold': 'sum',
-            'silver': 'sum',
-            'bronze': 'sum'
-        }).reset_index()
-        continent_medals.columns = ['continent', 'Gold Medal', 'Silver Medal', 'Bronze Medal']
+if not filtered_medals.empty and not medal_hierarchy.empty:
+    # Medals per continent and type, rolled up from the hierarchy
+    continent_medals = rollup(medal_hierarchy, ['continent', 'medal_type']).pivot(
+        index='continent', columns='medal_type', values='count'
+    ).fillna(0)
     
     # Create grouped bar chart
     fig = go.Figure()
     
-    fig.add_trace(go.Bar(
-        x=continent_medals['continent'],
-        y=continent_medals['Gold Medal'],
-        name='🥇 Gold',
-        marker_color='#FFD700'
-    ))
-    
-    fig.add_trace(go.Bar(
-        x=continent_medals['continent'],
-        y=continent_medals['Silver Medal'],
-        name='🥈 Silver',
-        marker_color='#C0C0C0'
-    ))
-    
-    fig.add_trace(go.Bar(
-        x=continent_medals['continent'],
-        y=continent_medals['Bronze Medal'],
-        name='🥉 Bronze',
-        marker_color='#CD7F32'
-    ))
+    medal_traces = (('Gold', '🥇 Gold', '#FFD700'), ('Silver', '🥈 Silver', '#C0C0C0'), ('Bronze', '🥉 Bronze', '#CD7F32'))
+    for medal_type, label, color in medal_traces:
+        if medal_type in continent_medals.columns:
+            fig.add_trace(go.Bar(
+                x=continent_medals.index,
+                y=continent_medals[medal_type],
+                name=label,
+                marker_color=color
+            ))
     
     fig.update_layout(
         title_text="<b>Medal Count by Continent</b>",
@@ -272,15 +211,8 @@ st.markdown("""
 
 if not filtered_medals.empty:
     # Calculate total medals for each country
-    country_col = 'country_long' if 'country_long' in filtered_medals.columns else 'country'
-    
-    if country_col in filtered_medals.columns:
-        # Determine medal columns
-        gold_col = 'Gold Medal' if 'Gold Medal' in filtered_medals.columns else 'gold'
-        silver_col = 'Silver Medal' if 'Silver Medal' in filtered_medals.columns else 'silver'
-        bronze_col = 'Bronze Medal' if 'Bronze Medal' in filtered_medals.columns else 'bronze'
-        
-        if all(col in filtered_medals.columns for col in [gold_col, silver_col, bronze_col]):
+    if country_col:
+        if gold_col and silver_col and bronze_col:
             # Calculate total medals
             filtered_medals['total_medals'] = filtered_medals[gold_col] + filtered_medals[silver_col] + filtered_medals[bronze_col]
             
@@ -335,6 +267,74 @@ if not filtered_medals.empty:
 else:
     st.warning("No medal data available for visualization")
 
+st.markdown("---")
+
+# --- Qualification Funnel ---
+st.markdown("""
+<div style="margin: 2rem 0;">
+    <h2 style="font-weight: 700; margin-bottom: 1.5rem; letter-spacing: -0.01em; color:#FFD700;">🎯 Qualification Funnel <span title='Entries reaching the semifinal, the final and the podium, in the events with a semifinal round' style='cursor:help;'>ℹ️</span></h2>
+</div>
+""", unsafe_allow_html=True)
+
+# Per-country funnel computed in one grouped pass over every discipline, cached per filter set
+funnel = country_funnel(spec)
+
+# Medal levels must add up to medals.csv; a gap means some awards found no entry in the results
+mismatches = funnel_medal_check()
+if not mismatches.empty:
+    st.warning("Funnel medals differ from medals.csv for: " + ", ".join(
+        f"{row.discipline_name} ({row.funnel_medals} vs {row.medals})" for row in mismatches.itertuples()
+    ))
+
+if not funnel.empty:
+    stage_labels = [stage.capitalize() for stage in FUNNEL_STAGES]
+    top_funnel = funnel.head(5)
+
+    col1, col2 = st.columns([3, 2])
+
+    with col1:
+        fig = go.Figure()
+        for _, row in top_funnel.iterrows():
+            fig.add_trace(go.Funnel(
+                name=row['country_long'],
+                y=stage_labels,
+                x=[row[stage] for stage in FUNNEL_STAGES],
+                textinfo="value+percent previous"
+            ))
+        fig.update_layout(
+            title_text="<b>Entries Converted at Each Stage (Top 5 Countries by Entries)</b>",
+            height=500
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    with col2:
+        totals = funnel[list(FUNNEL_STAGES)].sum()
+        st.markdown("### 🔢 All Selected Countries")
+        for previous, stage in zip(FUNNEL_STAGES, FUNNEL_STAGES[1:]):
+            rate = totals[stage] / totals[previous] if totals[previous] else 0
+            st.metric(f"{previous.capitalize()} → {stage.capitalize()}", f"{rate:.0%}", help=f"{int(totals[stage])} of {int(totals[previous])}")
+
+    st.markdown("### 📋 Conversion by Country")
+    display_funnel = funnel.head(20)[['country_long'] + list(FUNNEL_STAGES) + ['semifinal_rate', 'final_rate', 'medal_rate',
+                                                                          'no_semifinal_round']]
+    st.dataframe(
+        display_funnel,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'country_long': "Country",
+            **{stage: stage.capitalize() for stage in FUNNEL_STAGES},
+            'semifinal_rate': st.column_config.NumberColumn("Entry → Semifinal", format="percent"),
+            'final_rate': st.column_config.NumberColumn("Semifinal → Final", format="percent"),
+            'medal_rate': st.column_config.NumberColumn("Final → Medal", format="percent"),
+            'no_semifinal_round': "No semifinal round",
+        }
+    )
+    st.caption(f"{int(funnel['no_semifinal_round'].sum())} entries of events without a semifinal round "
+               "(straight finals, single-phase events) are left out of the funnel")
+else:
+    st.info("No results available for the selected filters")
+
 # Footer
 st.markdown("---")
 st.markdown(f"""
@@ -4,11 +4,9 @@ import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime
 import numpy as np
-import re
-import ast
 
 # Import styling
-from app import get_theme_css, render_sidebar, render_theme_toggle
+from app import get_theme_css, render_sidebar, render_theme_toggle, load_tables, filter_tables, compile_filters, resolve_columns, search_athletes, top_by_medals, lookup, athlete_profile, age_distribution
 
 # Page configuration
 st.set_page_config(
@@ -16,14 +14,11 @@ st.set_page_config(
     layout="wide"
 )
 
-# Load data from main app
-if "data" not in st.session_state:
-    st.warning("⚠️ Please go to the Dashboard first to load data")
-    if st.button("Go to Dashboard"):
-        st.switch_page("app.py")
-    st.stop()
+# Tables used by this page
+PAGE_TABLES = ('athletes', 'coaches', 'teams', 'medals', 'medallists', 'events')
 
-data = st.session_state.get("data", {})
+with st.spinner("Loading data..."):
+    data = load_tables(PAGE_TABLES)
 
 # Initialize theme
 if "theme" not in st.session_state:
@@ -68,202 +63,21 @@ events_data = data.get('events', pd.DataFrame())
 
 # Vérifier si les données sont chargées
 if athletes_data.empty:
-    st.error("❌ No athlete data loaded. Please return to the Dashboard.")
-    if st.button("Return to Dashboard"):
-        st.switch_page("app.py")
-    st.stop()
-
-# ============================================================
-# FONCTIONS POUR EXTRACTION DE DONNÉES
-# ============================================================
-def extract_weight_from_string(text):
-    """
-    Extrait le poids d'une chaîne de caractères.
-    Exemples: "Men -60 kg", "Women's +78kg", "100kg", "68-73 kg"
-    """
-    if not isinstance(text, str) or pd.isna(text):
-        return None
-    
-    text_lower = text.lower()
-    
-    # 1. Chercher les plages de poids (deux nombres séparés par un tiret)
-    range_pattern = r'(\d+\.?\d*)\s*-\s*(\d+\.?\d*)\s*kg'
-    range_match = re.search(range_pattern, text_lower)
-    if range_match:
-        try:
-            weight1 = float(range_match.group(1))
-            weight2 = float(range_match.group(2))
-            avg_weight = (weight1 + weight2) / 2
-            return round(avg_weight, 1)
-        except:
-            pass
-    
-    # 2. Chercher les poids simples
-    simple_patterns = [
-        r'[-+]*(\d+\.?\d*)\s*kg\b',  # -60 kg, +78kg, 100.5 kg
-        r'(\d+\.?\d*)\s*kilograms?\b',
-        r'(\d+\.?\d*)\s*kgs?\b',
-    ]
-    
-    for pattern in simple_patterns:
-        match = re.search(pattern, text_lower)
-        if match:
-            try:
-                weight = float(match.group(1))
-                return round(weight, 1)
-            except:
-                continue
-    
-    # 3. Chercher les livres et convertir
-    lb_patterns = [
-        r'(\d+)\s*lbs?\b',
-        r'(\d+)\s*pounds?\b'
-    ]
-    
-    for pattern in lb_patterns:
-        match = re.search(pattern, text_lower)
-        if match:
-            try:
-                weight_lbs = float(match.group(1))
-                weight_kg = weight_lbs * 0.453592
-                return round(weight_kg, 1)
-            except:
-                continue
-    
-    return None
-
-def extract_height_from_string(text):
-    """
-    Extrait la taille d'une chaîne de caractères.
-    Exemples: "180 cm", "1.80m", "5'11""
-    """
-    if not isinstance(text, str) or pd.isna(text):
-        return None
-    
-    text_lower = text.lower()
-    
-    patterns = [
-        r'(\d+\.?\d*)\s*cm\b',  # 180 cm
-        r'(\d+\.?\d*)\s*centimeters?\b',
-        r'(\d+)\.(\d+)\s*m\b',  # 1.80 m
-        r'(\d+)\'(\d+)\s*["\']?\b',  # 5'11"
-        r'height[:\s]*(\d+\.?\d*)\s*(cm|m)',
-        r'(\d+)\s*(cm|centimeter|m|meter)'
-    ]
-    
-    for pattern in patterns:
-        matches = re.findall(pattern, text_lower)
-        if matches:
-            try:
-                if "'" in text_lower:  # Pieds/pouces
-                    feet = float(matches[0][0])
-                    inches = float(matches[0][1])
-                    height_cm = (feet * 30.48) + (inches * 2.54)
-                    return round(height_cm, 1)
-                elif 'm' in text_lower and '.' in text_lower:  # Mètres
-                    meters = float(f"{matches[0][0]}.{matches[0][1]}")
-                    height_cm = meters * 100
-                    return round(height_cm, 1)
-                else:  # Centimètres
-                    height = float(matches[0][0])
-                    if 'm' in text_lower and height < 3:
-                        height = height * 100
-                    return round(height, 1)
-            except:
-                continue
-    
-    return None
-
-def parse_events_string(events_str):
-    """
-    Parse la chaîne d'événements qui peut être une liste Python ou une chaîne simple.
-    """
-    if pd.isna(events_str):
-        return []
-    
-    if isinstance(events_str, str):
-        if events_str.startswith('[') and events_str.endswith(']'):
-            try:
-                return ast.literal_eval(events_str)
-            except:
-                pass
-        return [events_str]
-    
-    if isinstance(events_str, list):
-        return events_str
-    
-    return []
-
-def get_athlete_weight_from_events(events_data):
-    """
-    Extrait le poids d'un athlète à partir de ses événements.
-    """
-    if pd.isna(events_data) or not events_data:
-        return None
-    
-    events_list = parse_events_string(events_data)
-    
-    weights = []
-    for event in events_list:
-        event_str = str(event)
-        weight = extract_weight_from_string(event_str)
-        if weight and weight > 30:  # Filtre pour éviter les valeurs aberrantes
-            weights.append(weight)
-    
-    if weights:
-        avg_weight = sum(weights) / len(weights)
-        return round(avg_weight, 1)
-    
-    return None
-
-def get_athlete_height_from_data(height_data, events_data):
-    """
-    Extrait la taille d'un athlète.
-    """
-    if not pd.isna(height_data) and height_data != 0 and height_data != '0':
-        try:
-            height = float(height_data)
-            if height > 100:  # Supposons que c'est en cm
-                return round(height, 1)
-            elif height > 1:  # Supposons que c'est en mètres
-                return round(height * 100, 1)
-        except:
-            pass
-    
-    events_list = parse_events_string(events_data)
-    heights = []
-    
-    for event in events_list:
-        height = extract_height_from_string(str(event))
-        if height and height > 100:  # Filtrer les valeurs < 100cm
-            heights.append(height)
-    
-    if heights:
-        avg_height = sum(heights) / len(heights)
-        return round(avg_height, 1)
-    
-    return None
+    st.info("Athlete profiles, age and gender analysis need the athletes table; medal rankings are still available below.")
 
 # ============================================================
 # APPLIQUER LES FILTRES
 # ============================================================
-filtered_athletes = athletes_data.copy()
+# Filtres de la barre latérale, mémorisés par (table, filtres) ; le filtre de sport
+# passe par l'index athlète ↔ discipline construit à partir des listes `disciplines`
+spec = compile_filters(selected_countries, selected_sports, selected_continent, medal_filters)
+filtered = filter_tables(data, spec)
+filtered_athletes = filtered.get('athletes', athletes_data)
 
 # Identifier les colonnes correctes
-country_col = 'country_long' if 'country_long' in filtered_athletes.columns else 'country'
+country_col = resolve_columns(athletes_data).get('country', 'country')
 name_col = 'name'
 disciplines_col = 'disciplines' if 'disciplines' in filtered_athletes.columns else None
-events_col = 'events' if 'events' in filtered_athletes.columns else None
-height_col = 'height' if 'height' in filtered_athletes.columns else None
-
-# Appliquer les filtres si les colonnes existent
-if selected_countries and country_col in filtered_athletes.columns:
-    filtered_athletes = filtered_athletes[filtered_athletes[country_col].isin(selected_countries)]
-
-if selected_sports and disciplines_col and disciplines_col in filtered_athletes.columns:
-    filtered_athletes = filtered_athletes[
-        filtered_athletes[disciplines_col].str.contains('|'.join(selected_sports), case=False, na=False)
-    ]
 
 # --- Athlete Detailed Profile Card ---
 st.markdown("""
@@ -276,15 +90,34 @@ st.markdown("""
 col1, col2 = st.columns([2, 1])
 with col1:
     if not filtered_athletes.empty and name_col:
-        athlete_names = sorted(filtered_athletes[name_col].dropna().unique())
-        selected_athlete = st.selectbox(
+        # Recherche côté serveur : seules les meilleures correspondances sont envoyées au navigateur
+        athlete_query = st.text_input(
             "🔍 Search for an athlete:",
-            options=athlete_names,
-            index=0 if athlete_names else None,
+            key="athlete_query",
+            placeholder="Type a name, e.g. marchand"
+        )
+        athlete_codes = search_athletes(athlete_query, spec)
+        # Les options sont des codes athlète : deux homonymes restent deux profils distincts
+        matches = lookup('athlete', athlete_codes)
+        labels = {}
+        if not matches.empty:
+            names = matches['name'].astype(str)
+            if 'country_code' in matches.columns:
+                names = names + ' (' + matches['country_code'].astype(str) + ')'
+            disciplines = lookup('disciplines', athlete_codes)
+            if 'discipline' in disciplines.columns:
+                first_discipline = disciplines.drop_duplicates('athlete_code').set_index('athlete_code')['discipline'].astype(str)
+                names = names + (' · ' + matches['code'].map(first_discipline)).fillna('')
+            labels = dict(zip(matches['code'], names))
+        selected_code = st.selectbox(
+            "Matching athletes",
+            options=athlete_codes,
+            index=0 if athlete_codes else None,
+            format_func=lambda code: labels.get(code, str(code)),
             key="athlete_search"
         )
     else:
-        selected_athlete = None
+        selected_code = None
         st.info("No athlete data available")
 
 with col2:
@@ -295,11 +128,15 @@ with col2:
     """, unsafe_allow_html=True)
 
 # Display athlete profile
-if selected_athlete and not filtered_athletes.empty:
-    athlete_rows = filtered_athletes[filtered_athletes[name_col] == selected_athlete]
+if selected_code is not None and not filtered_athletes.empty:
+    # Profil assemblé par recherches indexées sur les codes (athlète, équipe, entraîneur)
+    athlete_rows = lookup('athlete', selected_code)
     
     if not athlete_rows.empty:
         athlete_info = athlete_rows.iloc[0]
+        selected_athlete = str(athlete_info.get('name', selected_code))
+        profile = athlete_profile(selected_code)
+        athlete_events = profile['events']['event'].astype(str).tolist() if 'event' in profile['events'].columns else []
         
         st.markdown("---")
         
@@ -328,8 +165,8 @@ if selected_athlete and not filtered_athletes.empty:
             disciplines_display = athlete_info.get(disciplines_col, 'Not specified')
             
             sport_info = "Not specified"
-            if not medallists_data.empty and 'name' in medallists_data.columns and 'discipline' in medallists_data.columns:
-                athlete_disciplines = medallists_data[medallists_data['name'] == selected_athlete]['discipline'].unique()
+            if 'discipline' in profile['medals'].columns:
+                athlete_disciplines = profile['medals']['discipline'].dropna().astype(str).unique()
                 if len(athlete_disciplines) > 0:
                     sport_info = ", ".join(athlete_disciplines)
             
@@ -348,35 +185,29 @@ if selected_athlete and not filtered_athletes.empty:
                 <h4 style="color: #FFD700; margin-bottom: 10px;">Physical Stats</h4>
             """, unsafe_allow_html=True)
             
-            # Récupérer les données
-            height_data = athlete_info.get(height_col) if height_col else None
-            events_data = athlete_info.get(events_col) if events_col else None
-            disciplines_data = athlete_info.get(disciplines_col, '')
+            # Taille et poids calculés au chargement (height_cm, event_weight_kg)
+            athlete_event_rows = profile['events']
+            calculated_height = athlete_info.get('height_cm')
+            if pd.isna(calculated_height) and 'event_height_cm' in athlete_event_rows.columns:
+                calculated_height = athlete_event_rows['event_height_cm'].mean()
             
-            # 1. Calculer la taille
-            calculated_height = get_athlete_height_from_data(height_data, events_data)
-            
-            if calculated_height:
-                height_display = f"{calculated_height} cm"
+            if pd.notna(calculated_height):
+                height_display = f"{calculated_height:.1f} cm"
                 height_source = "extracted from data"
             else:
                 height_display = "N/A"
                 height_source = "data not available"
             
-            # 2. Calculer le poids
-            calculated_weight = get_athlete_weight_from_events(events_data)
+            calculated_weight = np.nan
+            if 'event_weight_kg' in athlete_event_rows.columns:
+                calculated_weight = athlete_event_rows['event_weight_kg'].mean()
             
-            if calculated_weight:
-                weight_display = f"{calculated_weight} kg"
+            if pd.notna(calculated_weight):
+                weight_display = f"{calculated_weight:.1f} kg"
                 weight_source = "extracted from events"
             else:
-                discipline_weight = extract_weight_from_string(str(disciplines_data))
-                if discipline_weight and discipline_weight > 30:
-                    weight_display = f"{discipline_weight} kg"
-                    weight_source = "extracted from discipline"
-                else:
-                    weight_display = "N/A"
-                    weight_source = "data not available"
+                weight_display = "N/A"
+                weight_source = "data not available"
             
             # Afficher les métriques avec tooltip
             st.metric("📏 Height", height_display, 
@@ -399,11 +230,12 @@ if selected_athlete and not filtered_athletes.empty:
         
         with col1:
             st.markdown("### 👨‍🏫 Coach Information")
-            if not coaches_data.empty and country_col in coaches_data.columns:
-                coaches_from_country = coaches_data[coaches_data[country_col] == country_display]
+            if not coaches_data.empty:
+                # Entraîneurs des équipes de l'athlète, puis de son pays
+                athlete_coaches = profile['coaches']
                 
-                if not coaches_from_country.empty:
-                    for idx, coach in coaches_from_country.head(5).iterrows():
+                if not athlete_coaches.empty:
+                    for idx, coach in athlete_coaches.iterrows():
                         coach_name = coach.get('name', 'Unknown')
                         coach_country = coach.get(country_col, 'Unknown')
                         st.write(f"• **{coach_name}**")
@@ -419,7 +251,7 @@ if selected_athlete and not filtered_athletes.empty:
             
             birth_date = athlete_info.get('birth_date', 'N/A')
             if pd.notna(birth_date) and birth_date != 'N/A':
-                st.write(f"**Birth Date:** {birth_date}")
+                st.write(f"**Birth Date:** {pd.Timestamp(birth_date):%Y-%m-%d}")
             
             birth_place = athlete_info.get('birth_place', 'N/A')
             if pd.notna(birth_place) and birth_place != 'N/A':
@@ -430,42 +262,26 @@ if selected_athlete and not filtered_athletes.empty:
                 st.write(f"**Nationality:** {nationality}")
             
             # Afficher les événements formatés
-            if events_col and events_col in athlete_info:
-                events_data = athlete_info[events_col]
-                if pd.notna(events_data) and events_data != 'N/A':
-                    try:
-                        if isinstance(events_data, str) and events_data.startswith('['):
-                            events_list = ast.literal_eval(events_data)
-                            if isinstance(events_list, list) and events_list:
-                                st.write("**Events:**")
-                                for event in events_list:
-                                    event_str = str(event)
-                                    weight = extract_weight_from_string(event_str)
-                                    if weight and weight > 30:
-                                        st.write(f"• {event_str} (≈{weight} kg)")
-                                    else:
-                                        st.write(f"• {event_str}")
-                        else:
-                            event_str = str(events_data)
-                            weight = extract_weight_from_string(event_str)
-                            if weight and weight > 30:
-                                st.write(f"**Events:** {event_str} (≈{weight} kg)")
-                            else:
-                                st.write(f"**Events:** {event_str}")
-                    except:
-                        st.write(f"**Events:** {events_data}")
-                else:
-                    st.write("**Events:** N/A")
+            if athlete_events:
+                st.write("**Events:**")
+                event_weights = (athlete_event_rows['event_weight_kg'].tolist()
+                                 if 'event_weight_kg' in athlete_event_rows.columns else [np.nan] * len(athlete_events))
+                for event_str, weight in zip(athlete_events, event_weights):
+                    if pd.notna(weight):
+                        st.write(f"• {event_str} (≈{weight:.1f} kg)")
+                    else:
+                        st.write(f"• {event_str}")
             else:
                 st.write("**Events:** N/A")
             
-            if not teams_data.empty and 'name' in teams_data.columns:
-                athlete_teams = teams_data[teams_data['name'] == selected_athlete]
+            if not teams_data.empty:
+                # Équipes de l'athlète via la table pont team_athletes
+                athlete_teams = profile['teams']
                 if not athlete_teams.empty:
                     st.write("**Team(s):**")
                     for _, team in athlete_teams.iterrows():
-                        team_name = team.get('team_name', team.get('team', 'Unknown'))
-                        st.write(f"• {team_name}")
+                        team_name = team.get('team', 'Unknown')
+                        st.write(f"• {team_name} ({team.get('discipline', '')})")
                 else:
                     st.write("**Team(s):** N/A")
             else:
@@ -476,7 +292,7 @@ if selected_athlete and not filtered_athletes.empty:
         st.markdown("### 🏅 Medal Achievements")
         
         if not medallists_data.empty and 'name' in medallists_data.columns and 'medal_type' in medallists_data.columns:
-            athlete_medals = medallists_data[medallists_data['name'] == selected_athlete]
+            athlete_medals = profile['medals']
             
             if not athlete_medals.empty:
                 athlete_medals['medal_type_clean'] = athlete_medals['medal_type'].astype(str).str.strip()
@@ -500,16 +316,7 @@ if selected_athlete and not filtered_athletes.empty:
                 
                 st.markdown("#### Medal Details")
                 if 'event' in athlete_medals.columns:
-                    display_data = athlete_medals.copy()
-                    
-                    display_data['Weight (kg)'] = display_data.apply(
-                        lambda row: extract_weight_from_string(str(row.get('event', ''))), 
-                        axis=1
-                    )
-                    
-                    display_data['Weight (kg)'] = display_data['Weight (kg)'].apply(
-                        lambda x: x if x and x > 10 else None
-                    )
+                    display_data = athlete_medals.rename(columns={'event_weight_kg': 'Weight (kg)'})
                     
                     display_cols = ['medal_type', 'event', 'discipline', 'Weight (kg)', 'medal_date']
                     available_cols = [col for col in display_cols if col in display_data.columns]
@@ -522,7 +329,8 @@ if selected_athlete and not filtered_athletes.empty:
                             column_config={
                                 'Weight (kg)': st.column_config.NumberColumn(
                                     format="%.1f kg"
-                                )
+                                ),
+                                'medal_date': st.column_config.DateColumn(format="YYYY-MM-DD")
                             }
                         )
                 else:
@@ -531,6 +339,17 @@ if selected_athlete and not filtered_athletes.empty:
                 st.info(f"No medals found for {selected_athlete}")
         else:
             st.info("Medallists data not available")
+        
+        # Résultats de l'athlète dans les partitions de ses disciplines
+        athlete_results = profile['results']
+        if not athlete_results.empty:
+            st.markdown("### 🏁 Competition Results")
+            result_cols = ['date', 'discipline_name', 'event_name', 'event_stage', 'rank', 'result', 'qualification_mark']
+            st.dataframe(
+                athlete_results[[col for col in result_cols if col in athlete_results.columns]].sort_values('date'),
+                use_container_width=True,
+                hide_index=True
+            )
 
 st.markdown("---")
 
@@ -541,109 +360,83 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Recharger filtered_athletes pour l'analyse d'âge
-filtered_athletes = athletes_data.copy()
-if selected_countries and country_col in filtered_athletes.columns:
-    filtered_athletes = filtered_athletes[filtered_athletes[country_col].isin(selected_countries)]
-if selected_sports and disciplines_col and disciplines_col in filtered_athletes.columns:
-    filtered_athletes = filtered_athletes[
-        filtered_athletes[disciplines_col].str.contains('|'.join(selected_sports), case=False, na=False)
-    ]
+# Résumé des âges (quantiles et effectifs) mémorisé par filtres ; les colonnes
+# age_at_games et age_group sont calculées au chargement
+age_data = age_distribution(spec, by='gender') if not filtered_athletes.empty else None
 
-if not filtered_athletes.empty:
-    if 'birth_date' in filtered_athletes.columns:
-        try:
-            filtered_athletes['birth_date_parsed'] = pd.to_datetime(filtered_athletes['birth_date'], errors='coerce')
-            current_year = 2024
-            filtered_athletes['age'] = current_year - filtered_athletes['birth_date_parsed'].dt.year
-            
-            filtered_athletes = filtered_athletes[filtered_athletes['age'].between(10, 60)]
-            
-            if not filtered_athletes.empty and filtered_athletes['age'].notna().sum() > 0:
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    if 'gender' in filtered_athletes.columns:
-                        fig = px.box(
-                            filtered_athletes,
-                            x='gender',
-                            y='age',
-                            title='<b>Age Distribution by Gender</b>',
-                            color='gender',
-                            color_discrete_map={'M': '#0085CA', 'F': '#EE334E', 'Male': '#0085CA', 'Female': '#EE334E'}
-                        )
-                        fig.update_layout(
-                            height=500,
-                            xaxis_title="Gender",
-                            yaxis_title="Age",
-                            showlegend=False
-                        )
-                        st.plotly_chart(fig, use_container_width=True)
-                    else:
-                        fig = px.histogram(
-                            filtered_athletes,
-                            x='age',
-                            nbins=30,
-                            title='<b>Overall Age Distribution</b>',
-                            color_discrete_sequence=['#0085CA']
-                        )
-                        fig.update_layout(height=500, xaxis_title="Age", yaxis_title="Count")
-                        st.plotly_chart(fig, use_container_width=True)
-                
-                with col2:
-                    st.markdown("### 📈 Age Statistics")
-                    
-                    age_stats = filtered_athletes['age'].describe()
-                    col_stat1, col_stat2 = st.columns(2)
-                    
-                    with col_stat1:
-                        st.metric("👥 Total Athletes", int(age_stats['count']))
-                        st.metric("📊 Average Age", f"{age_stats['mean']:.1f}")
-                        st.metric("📈 Median Age", f"{age_stats['50%']:.1f}")
-                    
-                    with col_stat2:
-                        st.metric("👶 Youngest", int(age_stats['min']))
-                        st.metric("👴 Oldest", int(age_stats['max']))
-                        st.metric("📐 Age Range", f"{int(age_stats['max'] - age_stats['min'])}")
-                    
-                    st.markdown("#### Age Groups")
-                    age_bins = [10, 20, 25, 30, 35, 40, 50, 60]
-                    age_labels = ['10-19', '20-24', '25-29', '30-34', '35-39', '40-49', '50-60']
-                    
-                    filtered_athletes['age_group'] = pd.cut(
-                        filtered_athletes['age'], 
-                        bins=age_bins, 
-                        labels=age_labels, 
-                        right=False
-                    )
-                    
-                    age_group_counts = filtered_athletes['age_group'].value_counts().sort_index()
-                    
-                    fig = px.bar(
-                        x=age_group_counts.index,
-                        y=age_group_counts.values,
-                        title='<b>Athletes by Age Group</b>',
-                        color=age_group_counts.values,
-                        color_continuous_scale='Viridis'
-                    )
-                    fig.update_layout(
-                        height=300,
-                        xaxis_title="Age Group",
-                        yaxis_title="Number of Athletes",
-                        showlegend=False
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
-            
-            else:
-                st.info("No valid age data available after cleaning")
-        
-        except Exception as e:
-            st.warning(f"Could not parse birth dates: {str(e)[:100]}...")
-            st.info("Birth date format might be different or contain invalid values")
-    else:
-        st.info("Birth date column not found in athlete data")
-else:
+if age_data is None:
     st.info("No athlete data available for age analysis")
+elif 'age_at_games' not in filtered_athletes.columns:
+    st.info("Birth date column not found in athlete data")
+elif age_data['stats']['count'] == 0:
+    st.info("No valid age data available after cleaning")
+else:
+    age_stats = age_data['stats']
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        age_boxes = age_data['boxes']
+        if 'gender' in filtered_athletes.columns:
+            gender_colors = {'M': '#0085CA', 'F': '#EE334E', 'Male': '#0085CA', 'Female': '#EE334E'}
+            fig = go.Figure()
+            for gender, box in age_boxes.iterrows():
+                fig.add_trace(go.Box(
+                    name=gender,
+                    q1=[box['q1']], median=[box['median']], q3=[box['q3']],
+                    lowerfence=[box['lowerfence']], upperfence=[box['upperfence']], mean=[box['mean']],
+                    marker_color=gender_colors.get(gender, '#0085CA')
+                ))
+            fig.update_layout(
+                title='<b>Age Distribution by Gender</b>',
+                height=500,
+                xaxis_title="Gender",
+                yaxis_title="Age",
+                showlegend=False
+            )
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            age_counts = age_data['ages']
+            fig = px.bar(
+                x=age_counts.index,
+                y=age_counts.values,
+                title='<b>Overall Age Distribution</b>',
+                color_discrete_sequence=['#0085CA']
+            )
+            fig.update_layout(height=500, xaxis_title="Age", yaxis_title="Count", bargap=0)
+            st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        st.markdown("### 📈 Age Statistics")
+        
+        col_stat1, col_stat2 = st.columns(2)
+        
+        with col_stat1:
+            st.metric("👥 Total Athletes", int(age_stats['count']))
+            st.metric("📊 Average Age", f"{age_stats['mean']:.1f}")
+            st.metric("📈 Median Age", f"{age_stats['median']:.1f}")
+        
+        with col_stat2:
+            st.metric("👶 Youngest", int(age_stats['min']))
+            st.metric("👴 Oldest", int(age_stats['max']))
+            st.metric("📐 Age Range", f"{int(age_stats['max'] - age_stats['min'])}")
+        
+        st.markdown("#### Age Groups")
+        age_group_counts = age_data['groups']
+        
+        fig = px.bar(
+            x=age_group_counts.index,
+            y=age_group_counts.values,
+            title='<b>Athletes by Age Group</b>',
+            color=age_group_counts.values,
+            color_continuous_scale='Viridis'
+        )
+        fig.update_layout(
+            height=300,
+            xaxis_title="Age Group",
+            yaxis_title="Number of Athletes",
+            showlegend=False
+        )
+        st.plotly_chart(fig, use_container_width=True)
 
 st.markdown("---")
 
@@ -654,20 +447,12 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Recharger filtered_athletes pour l'analyse de genre
-filtered_athletes = athletes_data.copy()
-if selected_countries and country_col in filtered_athletes.columns:
-    filtered_athletes = filtered_athletes[filtered_athletes[country_col].isin(selected_countries)]
-if selected_sports and disciplines_col and disciplines_col in filtered_athletes.columns:
-    filtered_athletes = filtered_athletes[
-        filtered_athletes[disciplines_col].str.contains('|'.join(selected_sports), case=False, na=False)
-    ]
-
 if not filtered_athletes.empty and 'gender' in filtered_athletes.columns:
     col1, col2 = st.columns(2)
     
     with col1:
         gender_counts = filtered_athletes['gender'].value_counts()
+        gender_counts = gender_counts[gender_counts > 0]
         
         gender_labels = {
             'M': 'Male', 'F': 'Female',
@@ -687,11 +472,12 @@ if not filtered_athletes.empty and 'gender' in filtered_athletes.columns:
     
     with col2:
         if country_col in filtered_athletes.columns:
-            top_countries = filtered_athletes[country_col].value_counts().head(10).index.tolist()
+            country_counts = filtered_athletes[country_col].value_counts()
+            top_countries = country_counts[country_counts > 0].head(10).index.tolist()
             country_gender_data = filtered_athletes[filtered_athletes[country_col].isin(top_countries)]
             
             if not country_gender_data.empty:
-                gender_by_country = country_gender_data.groupby([country_col, 'gender']).size().reset_index(name='count')
+                gender_by_country = country_gender_data.groupby([country_col, 'gender'], observed=True).size().reset_index(name='count')
                 gender_by_country['gender'] = gender_by_country['gender'].map(lambda x: gender_labels.get(x, x))
                 
                 fig = px.bar(
@@ -727,47 +513,10 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 if not medallists_data.empty and 'name' in medallists_data.columns and 'medal_type' in medallists_data.columns:
-    filtered_medallists = medallists_data.copy()
-    
-    if selected_countries:
-        country_cols_to_try = ['country_long', 'country', 'country_name', 'nationality', 'Team_Country']
-        country_col_found = None
-        
-        for col in country_cols_to_try:
-            if col in filtered_medallists.columns:
-                country_col_found = col
-                break
-        
-        if country_col_found:
-            filtered_medallists = filtered_medallists[
-                filtered_medallists[country_col_found].isin(selected_countries)
-            ]
-    
-    filtered_medallists['medal_type_clean'] = filtered_medallists['medal_type'].astype(str).str.strip()
-    
-    medal_summary = []
-    
-    for name in filtered_medallists['name'].unique():
-        athlete_medals = filtered_medallists[filtered_medallists['name'] == name]
-        
-        gold_count = (athlete_medals['medal_type_clean'] == 'Gold Medal').sum()
-        silver_count = (athlete_medals['medal_type_clean'] == 'Silver Medal').sum()
-        bronze_count = (athlete_medals['medal_type_clean'] == 'Bronze Medal').sum()
-        total_count = len(athlete_medals)
-        
-        medal_summary.append({
-            'name': name,
-            'Gold': gold_count,
-            'Silver': silver_count,
-            'Bronze': bronze_count,
-            'Total': total_count
-        })
+    # Classement calculé en une passe groupée par code_athlete, mémorisé par filtres
+    top_athletes = top_by_medals(spec, by='athlete', top=10)
     
-    medal_summary_df = pd.DataFrame(medal_summary)
-    
-    if not medal_summary_df.empty:
-        top_athletes = medal_summary_df.nlargest(10, 'Total')
-        
+    if not top_athletes.empty:
         fig = go.Figure()
         
         fig.add_trace(go.Bar(
@@ -812,27 +561,13 @@ if not medallists_data.empty and 'name' in medallists_data.columns and 'medal_ty
         
         st.markdown("### 📋 Top Athletes Details")
         
-        display_data = top_athletes.copy()
-        
-        country_col_found = None
-        country_cols_to_try = ['country_long', 'country', 'country_name', 'nationality', 'Team_Country']
+        display_data = top_athletes
         
-        for col in country_cols_to_try:
-            if col in filtered_medallists.columns:
-                country_col_found = col
-                break
+        # Le pays est rattaché par le classement lui-même
+        country_col_found = resolve_columns(medallists_data).get('country')
         
-        if country_col_found:
-            country_mapping = {}
-            for name in display_data['name']:
-                athlete_data = filtered_medallists[filtered_medallists['name'] == name]
-                if not athlete_data.empty:
-                    country = athlete_data.iloc[0][country_col_found]
-                    country_mapping[name] = country
-                else:
-                    country_mapping[name] = 'Unknown'
-            
-            display_data['Country'] = display_data['name'].map(country_mapping)
+        if country_col_found in display_data.columns:
+            display_data = display_data.rename(columns={country_col_found: 'Country'})
             display_columns = ['name', 'Country', 'Gold', 'Silver', 'Bronze', 'Total']
             column_names = ['Athlete', 'Country', '🥇 Gold', '🥈 Silver', '🥉 Bronze', 'Total Medals']
         else:
@@ -5,7 +5,7 @@ import plotly.express as px
 from datetime import datetime
 
 # Import styling from your main app
-from app import get_theme_css, render_sidebar, render_theme_toggle
+from app import get_theme_css, render_sidebar, render_theme_toggle, load_tables, filter_tables, compile_filters, medal_columns, medal_counts, resolve_columns, query_results, result_disciplines, result_margins, event_progression, stage_progression, session_details, session_coverage, start_order_bias, start_order_stage_types, GAMES_TZ
 
 # Page configuration
 st.set_page_config(
@@ -13,12 +13,11 @@ st.set_page_config(
     layout="wide"
 )
 
-# Load data from main app
-if "data" not in st.session_state:
-    st.info("Please go to the main page first to load data")
-    st.stop()
+# Tables used by this page
+PAGE_TABLES = ('events', 'venues', 'medals', 'schedules', 'venue_sports')
 
-data = st.session_state.get("data", {})
+with st.spinner("Loading data..."):
+    data = load_tables(PAGE_TABLES)
 
 # Initialize theme
 if "theme" not in st.session_state:
@@ -34,7 +33,6 @@ st.markdown(get_theme_css(current_theme, animated=animate_header), unsafe_allow_
 render_theme_toggle()
 
 # Sidebar filters
-data = st.session_state.get("data", {})
 selected_countries, selected_sports, selected_continent, medal_filters = render_sidebar(active_page="sports", data=data)
 st.session_state['selected_countries'] = selected_countries
 st.session_state['selected_sports'] = selected_sports
@@ -53,11 +51,15 @@ st.markdown(f"""
     </div>
 """, unsafe_allow_html=True)
 
+# Apply the sidebar filters once per table (memoized per table and filter spec)
+spec = compile_filters(selected_countries, selected_sports, selected_continent, medal_filters)
+filtered = filter_tables(data, spec)
+
 # Get data
 events_data = data.get('events', pd.DataFrame())
 venues_data = data.get('venues', pd.DataFrame())
-medals_total_data = data.get('medals_total', pd.DataFrame())
 schedule_data = data.get('schedules', pd.DataFrame())
+venue_sports_data = data.get('venue_sports', pd.DataFrame())
 
 # ==================== OVERVIEW SECTION ====================
 st.markdown("""
@@ -69,42 +71,11 @@ st.markdown("""
 if events_data.empty:
     st.warning("No events data available")
 else:
-    # Apply filters to events data
-    filtered_events = events_data.copy()
-    filtered_medals = medals_total_data.copy() if not medals_total_data.empty else pd.DataFrame()
-    
-    # Find sport column for filtering
-    sport_col = None
-    for col in filtered_events.columns:
-        if col.lower() == 'sport':
-            sport_col = col
-            break
-    
-    # Apply sport filter from sidebar
-    if selected_sports and sport_col:
-        filtered_events = filtered_events[filtered_events[sport_col].isin(selected_sports)]
-    
-    # Apply country filter from sidebar
-    if selected_countries:
-        # Try to find country column
-        country_col = None
-        for col in filtered_events.columns:
-            if 'country' in col.lower():
-                country_col = col
-                break
-        
-        if country_col and country_col in filtered_events.columns:
-            filtered_events = filtered_events[filtered_events[country_col].isin(selected_countries)]
-    
-    # Apply continent filter to medals if available
-    if selected_continent and not filtered_medals.empty and 'continent' in filtered_medals.columns:
-        filtered_medals = filtered_medals[filtered_medals['continent'].isin(selected_continent)]
-    
-    # Apply country filter to medals
-    if selected_countries and not filtered_medals.empty:
-        country_col = 'country_long' if 'country_long' in filtered_medals.columns else 'country'
-        if country_col in filtered_medals.columns:
-            filtered_medals = filtered_medals[filtered_medals[country_col].isin(selected_countries)]
+    # Sidebar filters applied to events and medals
+    sport_col = resolve_columns(events_data).get('sport')
+    filtered_events = filtered.get('events', events_data)
+    filtered_medals = medal_counts(spec)
+    selected_medal_cols = medal_columns(filtered_medals, spec)
     
     # Key metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -124,8 +95,8 @@ else:
         else:
             st.metric("🏟️ Total Venues", "N/A")
     with col4:
-        if not schedule_data.empty and 'start_date' in schedule_data.columns:
-            days_count = pd.to_datetime(schedule_data['start_date']).dt.date.nunique()
+        if not schedule_data.empty and 'start_day' in schedule_data.columns:
+            days_count = schedule_data['start_day'].nunique()
             st.metric("📅 Competition Days", f"{days_count}")
         else:
             st.metric("📅 Competition Days", "N/A")
@@ -144,7 +115,8 @@ else:
     with col1:
         st.markdown("### 📈 Events Distribution by Sport")
         if sport_col and len(filtered_events) > 0:
-            sport_counts = filtered_events[sport_col].value_counts().head(15)
+            sport_counts = filtered_events[sport_col].value_counts()
+            sport_counts = sport_counts[sport_counts > 0].head(15)
             fig = px.bar(
                 x=sport_counts.values,
                 y=sport_counts.index,
@@ -169,30 +141,14 @@ else:
     with col2:
         st.markdown("### 🏆 Medal Distribution by Country")
         if not filtered_medals.empty:
-            # Get medal columns based on your data structure
-            medal_cols = ['Gold Medal', 'Silver Medal', 'Bronze Medal', 'gold', 'silver', 'bronze']
-            available_medal_cols = [col for col in medal_cols if col in filtered_medals.columns]
-            
-            # Apply medal type filters from sidebar
-            if medal_filters:
-                filtered_medal_cols = []
-                for col in available_medal_cols:
-                    if 'gold' in col.lower() and medal_filters.get('gold', True):
-                        filtered_medal_cols.append(col)
-                    elif 'silver' in col.lower() and medal_filters.get('silver', True):
-                        filtered_medal_cols.append(col)
-                    elif 'bronze' in col.lower() and medal_filters.get('bronze', True):
-                        filtered_medal_cols.append(col)
-                available_medal_cols = filtered_medal_cols
+            # Medal columns kept by the sidebar medal type filters
+            available_medal_cols = selected_medal_cols
 
             if available_medal_cols:
-                # Determine country column name
-                country_col = 'country_long' if 'country_long' in filtered_medals.columns else 'country'
-                if country_col not in filtered_medals.columns and len(filtered_medals.columns) > 0:
-                    country_col = filtered_medals.columns[0]
+                country_col = resolve_columns(filtered_medals).get('country', filtered_medals.columns[0])
                 
-                # Group medals by country
-                country_medals = filtered_medals.groupby(country_col)[available_medal_cols].sum().sum(axis=1).sort_values(ascending=False).head(10)
+                # Medal counts are already one row per country
+                country_medals = filtered_medals.set_index(country_col)[available_medal_cols].sum(axis=1).nlargest(10)
                 
                 if len(country_medals) > 0:
                     fig = px.pie(
@@ -224,12 +180,9 @@ else:
     """, unsafe_allow_html=True)
 
     if not schedule_data.empty:
-        # Apply filters to schedule data from sidebar
-        filtered_schedule = schedule_data.copy()
-        
-        # Apply sport filter from sidebar to schedule
-        if selected_sports and 'sport' in filtered_schedule.columns:
-            filtered_schedule = filtered_schedule[filtered_schedule['sport'].isin(selected_sports)]
+        # Schedule rows matching the sidebar (schedules name the sport "discipline")
+        filtered_schedule = filtered.get('schedules', schedule_data)
+        schedule_sport_col = resolve_columns(schedule_data).get('sport')
         
         # Only keep venue and date filters (removed sport filter since it's in sidebar)
         col1, col2 = st.columns(2)
@@ -243,11 +196,12 @@ else:
             )
 
         with col2:
-            if 'start_date' in filtered_schedule.columns:
-                dates = pd.to_datetime(filtered_schedule['start_date']).dt.date.unique()
+            if 'start_day' in filtered_schedule.columns:
+                dates = filtered_schedule['start_day'].dropna().unique()
                 selected_date = st.selectbox(
                     "📆 Filter by Date",
                     ["All Dates"] + sorted(dates),
+                    format_func=lambda d: d if isinstance(d, str) else f"{d:%Y-%m-%d}",
                     key="schedule_date_filter"
                 )
             else:
@@ -259,7 +213,7 @@ else:
 
         # Apply date filter
         if selected_date != "All Dates":
-            filtered_schedule = filtered_schedule[pd.to_datetime(filtered_schedule['start_date']).dt.date == selected_date]
+            filtered_schedule = filtered_schedule[filtered_schedule['start_day'] == selected_date]
 
         # View selector
         st.markdown("### 📊 Visualization Options")
@@ -280,12 +234,20 @@ else:
                 y_col = 'event' if 'event' in filtered_schedule.columns else 'sport'
                 color_col = 'venue' if 'venue' in filtered_schedule.columns else 'sport'
                 
+                # Show local (Paris) times on the timeline
+                # Each bar carries the row position of its session (index of the schedules table)
+                timeline_data = filtered_schedule.assign(
+                    start_date=filtered_schedule['start_date'].dt.tz_convert(GAMES_TZ),
+                    end_date=filtered_schedule['end_date'].dt.tz_convert(GAMES_TZ),
+                    session=filtered_schedule.index
+                )
                 fig = px.timeline(
-                    filtered_schedule,
+                    timeline_data,
                     x_start='start_date',
                     x_end='end_date',
                     y=y_col,
                     color=color_col,
+                    custom_data=['session'],
                     title=f'Event Schedule ({len(filtered_schedule)} events)',
                     height=600
                 )
@@ -296,32 +258,62 @@ else:
                     margin=dict(t=40, l=0, r=0, b=0),
                     showlegend=True
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                timeline_event = st.plotly_chart(fig, use_container_width=True, on_select="rerun",
+                                                 selection_mode="points", key="schedule_timeline")
+                selected_points = timeline_event.selection.points if timeline_event else []
+                selected_session = selected_points[0]['customdata'][0] if selected_points else None
 
                 # Schedule summary
                 st.markdown("### 📋 Schedule Summary")
-                summary_cols = ['sport', 'event', 'venue', 'start_date', 'end_date']
+                summary_cols = [schedule_sport_col, 'event', 'venue', 'start_date', 'end_date']
                 available_summary_cols = [col for col in summary_cols if col in filtered_schedule.columns]
 
                 if available_summary_cols:
                     display_df = filtered_schedule[available_summary_cols].copy()
                     if 'start_date' in display_df.columns:
-                        display_df['start_date'] = pd.to_datetime(display_df['start_date']).dt.strftime('%Y-%m-%d %H:%M')
+                        display_df['start_date'] = display_df['start_date'].dt.tz_convert(GAMES_TZ).dt.strftime('%Y-%m-%d %H:%M')
                     if 'end_date' in display_df.columns:
-                        display_df['end_date'] = pd.to_datetime(display_df['end_date']).dt.strftime('%Y-%m-%d %H:%M')
+                        display_df['end_date'] = display_df['end_date'].dt.tz_convert(GAMES_TZ).dt.strftime('%Y-%m-%d %H:%M')
+
+                    summary_event = st.dataframe(display_df, use_container_width=True, hide_index=True,
+                                                 on_select="rerun", selection_mode="single-row",
+                                                 key="schedule_summary")
+                    if summary_event and summary_event.selection.rows:
+                        selected_session = display_df.index[summary_event.selection.rows[0]]
+
+                # Results and medals of the selected session, through its stage key
+                if selected_session is not None:
+                    session = schedule_data.loc[selected_session]
+                    details = session_details(int(selected_session))
+                    st.markdown(f"### 🔎 {session.get('phase', session.get('event', 'Session'))}")
+
+                    if not details['medals'].empty:
+                        medal_cols = [col for col in ['medal_type', 'name', 'country'] if col in details['medals'].columns]
+                        st.dataframe(details['medals'][medal_cols], use_container_width=True, hide_index=True)
+
+                    if not details['results'].empty:
+                        session_cols = ['rank', 'participant_name', 'participant_country', 'result', 'qualification_mark']
+                        st.dataframe(details['results'][session_cols].sort_values('rank'),
+                                     use_container_width=True, hide_index=True)
+                    elif details['medals'].empty:
+                        st.info("No results or medals linked to this session")
+                else:
+                    st.caption("Select a session on the timeline or in the summary to see its results and medals")
 
-                    st.dataframe(display_df, use_container_width=True, hide_index=True)
+                coverage = session_coverage()
+                if coverage:
+                    linked, total = coverage['sessions']
+                    st.caption(f"{linked} of {total} sessions with linked results")
             else:
                 st.info("No schedule data available for the selected filters")
         
         elif view_option == "Calendar Heatmap":
             st.markdown("### 📅 Calendar Heatmap")
-            if not filtered_schedule.empty and 'start_date' in filtered_schedule.columns:
-                # Create heatmap data
-                filtered_schedule['date'] = pd.to_datetime(filtered_schedule['start_date']).dt.date
-                heatmap_data = filtered_schedule.groupby('date').size().reset_index(name='count')
-                heatmap_data['day_of_week'] = pd.to_datetime(heatmap_data['date']).dt.day_name()
-                heatmap_data['week'] = pd.to_datetime(heatmap_data['date']).dt.isocalendar().week
+            if not filtered_schedule.empty and 'start_day' in filtered_schedule.columns:
+                # Create heatmap data from the day/week columns derived at load time
+                heatmap_data = filtered_schedule.groupby(['start_day', 'start_iso_week']).size().reset_index(name='count')
+                heatmap_data = heatmap_data.rename(columns={'start_iso_week': 'week'})
+                heatmap_data['day_of_week'] = heatmap_data['start_day'].dt.day_name()
                 
                 fig = px.density_heatmap(
                     heatmap_data,
@@ -368,15 +360,9 @@ if not venues_data.empty:
                 sports_col = col
                 break
         
-        if sports_col:
-            # Handle different formats: comma-separated, list, or single sport
-            if venues_data[sports_col].dtype == 'object':
-                # Split comma-separated sports
-                sports_list = venues_data[sports_col].dropna().str.split(',').explode().str.strip()
-                total_sports_at_venues = sports_list.nunique()
-                st.metric("⚽ Sports Hosted", total_sports_at_venues)
-            else:
-                st.metric("⚽ Sports Hosted", venues_data[sports_col].nunique())
+        if not venue_sports_data.empty:
+            # One row per (venue, sport), exploded from the sports lists at load time
+            st.metric("⚽ Sports Hosted", venue_sports_data['sport'].nunique())
         else:
             st.metric("⚽ Sports Hosted", "N/A")
 
@@ -450,37 +436,13 @@ if not venues_data.empty:
     with col2:
         st.markdown("### 🗺️ Sports Distribution by Venue")
         
-        if name_col and sports_col:
+        if not venue_sports_data.empty:
             try:
-                # Create a copy for manipulation
-                venues_analysis = venues_data[[name_col, sports_col]].copy()
-                venues_analysis = venues_analysis.dropna()
-                
-                # Clean sports data
-                def clean_sports(sport_str):
-                    if pd.isna(sport_str):
-                        return []
-                    if isinstance(sport_str, str):
-                        # Split by comma, semicolon, or other delimiters
-                        sports_list = []
-                        for delimiter in [',', ';', '|', '/', '&']:
-                            if delimiter in sport_str:
-                                sports_list = [s.strip() for s in sport_str.split(delimiter) if s.strip()]
-                                break
-                        if not sports_list:
-                            sports_list = [sport_str.strip()]
-                        return sports_list
-                    elif isinstance(sport_str, list):
-                        return sport_str
-                    else:
-                        return [str(sport_str)]
-                
-                # Apply cleaning function
-                venues_analysis['sports_list'] = venues_analysis[sports_col].apply(clean_sports)
-                venues_analysis['sports_count'] = venues_analysis['sports_list'].apply(len)
-                
-                # Filter out venues with 0 sports
-                venues_analysis = venues_analysis[venues_analysis['sports_count'] > 0]
+                # Sports per venue from the venue_sports bridge table
+                venues_analysis = venue_sports_data.groupby('venue', observed=True).agg(
+                    sports_count=('sport', 'size'),
+                    sports=('sport', lambda sports: ', '.join(sports.astype(str)))
+                ).reset_index()
                 
                 if len(venues_analysis) > 0:
                     # Sort by sports count and get top 15
@@ -489,12 +451,12 @@ if not venues_data.empty:
                     fig = px.bar(
                         venue_sports,
                         x='sports_count',
-                        y=name_col,
+                        y='venue',
                         orientation='h',
                         title='<b>Sports per Venue (Top 15)</b>',
                         color='sports_count',
                         color_continuous_scale='Blues',
-                        hover_data={name_col: True, 'sports_count': True, sports_col: True}
+                        hover_data={'venue': True, 'sports_count': True, 'sports': True}
                     )
                     fig.update_layout(
                         height=500,
@@ -518,17 +480,9 @@ if not venues_data.empty:
                 st.error(f"Error creating sports distribution chart: {e}")
                 st.info("Trying alternative visualization...")
                 
-                # Try simple count of venues by first sport
+                # Try simple count of venues by sport
                 try:
-                    venues_analysis = venues_data[[name_col, sports_col]].copy()
-                    venues_analysis = venues_analysis.dropna()
-                    
-                    # Extract first sport from each venue
-                    venues_analysis['first_sport'] = venues_analysis[sports_col].apply(
-                        lambda x: str(x).split(',')[0].strip() if isinstance(x, str) else str(x)
-                    )
-                    
-                    sport_counts = venues_analysis['first_sport'].value_counts().head(10)
+                    sport_counts = venue_sports_data['sport'].value_counts().head(10)
                     
                     fig = px.bar(
                         x=sport_counts.values,
@@ -573,7 +527,7 @@ if not venues_data.empty:
 
     with col2:
         # Apply search filter to events data for table
-        table_events = filtered_events.copy()
+        table_events = filtered_events
 
         # Apply search filter
         if event_search and 'event' in table_events.columns:
@@ -594,6 +548,156 @@ if not venues_data.empty:
         else:
             st.dataframe(table_events.head(50), use_container_width=True, hide_index=True)
 
+# ==================== EVENT RESULTS SECTION ====================
+disciplines = result_disciplines()
+if selected_sports:
+    disciplines = [discipline for discipline in disciplines if discipline in selected_sports] or disciplines
+
+if disciplines:
+    st.markdown("---")
+    st.markdown("""
+    <div style="margin: 2rem 0;">
+        <h2 style="font-weight: 700; margin-bottom: 1.5rem; letter-spacing: -0.01em; color:#FFD700;">🏁 Event Results</h2>
+    </div>
+    """, unsafe_allow_html=True)
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        selected_discipline = st.selectbox("Discipline", disciplines, key="results_discipline")
+
+    # Only the selected discipline's partition is loaded, narrowed by the sidebar filters
+    discipline_results = query_results(disciplines=[selected_discipline], spec=spec)
+
+    if discipline_results.empty:
+        st.info("No results available for this discipline")
+    else:
+        with col2:
+            event_options = sorted(discipline_results['event_name'].dropna().unique())
+            selected_event = st.selectbox("Event", event_options, key="results_event")
+
+        event_results = discipline_results[discipline_results['event_name'] == selected_event]
+
+        # Stages of the event in competition order (heats, semifinals, final)
+        event_codes = event_results['event_code'].dropna().unique()
+        event_stages = event_progression(event_codes[0], [selected_discipline]) if len(event_codes) else pd.DataFrame()
+        listed_stages = set(event_results['event_stage'].dropna())
+
+        with col3:
+            if not event_stages.empty:
+                stage_options = [stage for stage in event_stages['event_stage'] if stage in listed_stages]
+            else:
+                stage_options = list(event_results['event_stage'].dropna().unique())
+            selected_stage = st.selectbox("Stage", stage_options, key="results_stage")
+
+        stage_results = event_results[event_results['event_stage'] == selected_stage].sort_values('rank')
+        # Gap to the best result, read from the typed values computed at load time
+        stage_results = stage_results.assign(margin=result_margins(stage_results).round(3))
+        result_cols = ['rank', 'participant_name', 'participant_country', 'result', 'margin', 'result_unit', 'qualification_mark']
+
+        st.markdown(f"### 📊 {selected_stage} ({len(stage_results)} entries)")
+        st.dataframe(
+            stage_results[result_cols],
+            use_container_width=True,
+            hide_index=True,
+            column_config={'margin': st.column_config.NumberColumn("Gap to best"), 'result_unit': "Unit"}
+        )
+
+        # Progression of the stage's participants, read from the progression index
+        if not event_stages.empty and selected_stage in set(event_stages['event_stage']):
+            current = event_stages[event_stages['event_stage'] == selected_stage].iloc[0]
+            later_stages = event_stages[event_stages['phase_order'] > current['phase_order']]
+
+            if not later_stages.empty:
+                st.markdown("#### 🔀 Stage Progression")
+                col1, col2 = st.columns([1, 2])
+
+                with col1:
+                    st.metric("Entries", int(current['entries']))
+                    st.metric("Advanced to a later round", int(current['advanced']))
+
+                with col2:
+                    target_options = list(later_stages['event_stage'])
+                    target_stage = st.selectbox("Advanced to", target_options, index=len(target_options) - 1,
+                                                key="results_target_stage")
+                    target_code = later_stages.loc[later_stages['event_stage'] == target_stage, 'stage_code'].iloc[0]
+                    advancers = stage_progression(current['stage_code'], target_code, [selected_discipline])
+
+                    if advancers.empty:
+                        st.info(f"Nobody from {selected_stage} competed in {target_stage}")
+                    else:
+                        st.dataframe(
+                            advancers[['participant_name', 'participant_country_code', 'rank', 'to_rank', 'furthest_stage']],
+                            use_container_width=True,
+                            hide_index=True,
+                            column_config={
+                                'participant_name': "Participant",
+                                'participant_country_code': "Country",
+                                'rank': "Rank in stage",
+                                'to_rank': f"Rank in {target_stage}",
+                                'furthest_stage': "Furthest stage"
+                            }
+                        )
+
+# ==================== START ORDER BIAS SECTION ====================
+if disciplines:
+    st.markdown("---")
+    st.markdown("""
+    <div style="margin: 2rem 0;">
+        <h2 style="font-weight: 700; margin-bottom: 1.5rem; letter-spacing: -0.01em; color:#FFD700;">🎯 Start Order Bias</h2>
+    </div>
+    """, unsafe_allow_html=True)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        bias_discipline = st.selectbox("Discipline", ["All Disciplines"] + disciplines, key="bias_discipline")
+    bias_discipline = None if bias_discipline == "All Disciplines" else bias_discipline
+
+    with col2:
+        bias_stage = st.selectbox("Stage", ["All Stages"] + start_order_stage_types(bias_discipline), key="bias_stage")
+    bias_stage = None if bias_stage == "All Stages" else bias_stage
+
+    # Statistics per lane read from the cube pre-aggregated over every heat
+    bias = start_order_bias(bias_discipline, bias_stage)
+
+    if bias.empty:
+        st.info("Not enough starts with a start order for this selection")
+    else:
+        col1, col2 = st.columns(2)
+
+        with col1:
+            fig = px.bar(
+                bias,
+                x='start_order',
+                y='mean_relative_rank',
+                hover_data=['starts', 'mean_rank'],
+                title='<b>Mean Relative Rank by Start Position</b>',
+                color='mean_relative_rank',
+                color_continuous_scale='RdYlGn_r'
+            )
+            fig.update_layout(
+                height=400,
+                xaxis_title="Start Order / Lane",
+                yaxis_title="Relative Rank (0 = winner, 1 = last)",
+                coloraxis_showscale=False
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+        with col2:
+            fig = px.bar(
+                bias,
+                x='start_order',
+                y='win_rate',
+                hover_data=['starts'],
+                title='<b>Win Rate by Start Position</b>',
+                color_discrete_sequence=['#FFD700']
+            )
+            fig.update_layout(height=400, xaxis_title="Start Order / Lane", yaxis_title="Win Rate", yaxis_tickformat='.0%')
+            st.plotly_chart(fig, use_container_width=True)
+
+        st.caption(f"{int(bias['starts'].sum())} ranked starts; positions with fewer starts are not shown")
+
 # Footer
 st.markdown("---")
 st.markdown(f"""
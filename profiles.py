@@ -0,0 +1,49 @@
+"""
+Profile module for Olympic Games Dashboard
+Contains the keyed row lookups an athlete profile is assembled from, joined
+on athlete, team and coach codes instead of display names
+"""
+import numpy as np
+
+# Coaches listed on a profile: the coaches of the athlete's teams first, then
+# coaches of the same country
+PROFILE_COACHES = 5
+
+# Keyed lookups of a profile: lookup -> (table, key column)
+PROFILE_LOOKUPS = {
+    'athlete': ('athletes', 'code'),
+    'medals': ('medallists', 'code_athlete'),
+    'events': ('athlete_events', 'athlete_code'),
+    'disciplines': ('athlete_disciplines', 'athlete_code'),
+    'team_codes': ('team_athletes', 'athlete_code'),
+    'team': ('teams', 'code'),
+    'team_coaches': ('team_coaches', 'team_code'),
+    'coach': ('coaches', 'code'),
+    'country_coaches': ('coaches', 'country_code'),
+}
+
+
+def key_index(df, column):
+    """
+    Row positions of every key of a column, built in one grouped pass.
+
+    Returns:
+    - dict {key: array of row positions}, empty when the column is missing
+    """
+    if df.empty or column not in df.columns:
+        return {}
+    return df.groupby(column, observed=True, sort=False).indices
+
+
+def rows_for(df, index, keys):
+    """
+    Rows of a table for one key or a list of keys, in key order, via its key index.
+
+    Missing keys are skipped, so the result may be empty.
+    """
+    if not isinstance(keys, (list, tuple, np.ndarray)):
+        keys = [keys]
+    positions = [index[key] for key in keys if key in index]
+    if not positions:
+        return df.iloc[:0]
+    return df.iloc[np.concatenate(positions)]
@@ -0,0 +1,160 @@
+"""
+Progression module for Olympic Games Dashboard
+Contains the event progression index built from the results store: the
+ordered stages (heats, semifinals, final...) of each event and the stages
+each participant reached
+"""
+import numpy as np
+import pandas as pd
+
+from profiles import key_index, rows_for
+
+# Leading characters of a stage code naming its event and phase (round), without the
+# heat or unit number: "ATHM100M--------------RND1000200--" -> "ATHM100M--------------RND1"
+PHASE_CODE_LENGTH = 26
+
+# Characters of a stage code naming its round ("SFNL" in "...SFNL000100--")
+ROUND_CODE_START = 22
+FINAL_ROUND = 'FNL-'
+STANDINGS_ROUND = '----'
+
+# Stage names of classification units, contested for places rather than to progress: bronze
+# medal contests, and placing finals or semifinals ("Final B", "Semifinal C/D 1", "Placing 5-8")
+BRONZE_STAGE_PATTERN = r'Bronze'
+PLACING_STAGE_PATTERN = r'Final [B-H]\b|Semifinal [C-H]/|Small Final|Places|Placement|Placing|Classification'
+
+# Order of the stage kinds within an event: main rounds in schedule order, then the
+# classification units, then the main final and the whole-event standings
+STAGE_TIERS = {'main': 0, 'bronze': 1, 'placing': 1, 'final': 2, 'standings': 3}
+
+# Columns of a participant's row in a stage, kept by the index
+ENTRY_COLUMNS = ('event_code', 'stage_code', 'discipline_name', 'gender', 'participant_code', 'participant_name',
+                 'participant_country_code', 'participant_country', 'rank', 'result', 'qualification_mark')
+
+
+def stage_kinds(stages):
+    """
+    Kind of every stage (stage_code and stage columns): 'main', 'bronze', 'placing',
+    'final' (main final, e.g. Final A or the gold medal game) or 'standings'.
+    """
+    rounds = stages['stage_code'].astype(str).str[ROUND_CODE_START:PHASE_CODE_LENGTH]
+    names = stages['stage'].astype(str)
+    kinds = np.select(
+        [names.str.contains(BRONZE_STAGE_PATTERN, regex=True) | (rounds == 'REPF'),
+         names.str.contains(PLACING_STAGE_PATTERN, regex=True),
+         rounds == FINAL_ROUND,
+         rounds == STANDINGS_ROUND],
+        ['bronze', 'placing', 'final', 'standings'],
+        default='main',
+    )
+    return pd.Series(kinds, index=stages.index)
+
+
+def build_progression_index(results, stage_starts=None):
+    """
+    Index how every event of a results table progressed, in one grouped pass.
+
+    All units of a round share a phase, except classification units (bronze contests,
+    Finals B/C..., placing semifinals) which get phases of their own. Main rounds are
+    ordered by the start of their last unit as scheduled, then come the classification
+    phases, the main final and the whole-event standings. A participant advanced from a stage when they
+    appear in a later main phase of the same event, whatever qualification mark the
+    stage gave; classification units are not progress.
+
+    Parameters:
+    - results: results table (event_code, stage_code, stage, participant_code, date...)
+    - stage_starts: optional Series of scheduled start times by stage code, see
+      competition_keys.stage_start_times(); the results timestamp, which is when the
+      result was recorded, stands in for stages without one
+
+    Returns:
+    - dict with:
+      - 'stages': one row per stage in event and phase order (stage_kind, phase_order
+        from 1, entries, advanced)
+      - 'entries': one row per participant and stage, with the phase of the stage and
+        the furthest main stage the participant reached in the event (furthest_stage_code,
+        furthest_stage, furthest_rank, advanced)
+      - 'event_stages', 'stage_entries': row positions of each event code / stage code
+    """
+    empty = {
+        'stages': pd.DataFrame(columns=['event_code', 'stage_code', 'stage_kind', 'phase_order', 'entries', 'advanced']),
+        'entries': pd.DataFrame(columns=list(ENTRY_COLUMNS) + ['stage_kind', 'furthest_stage', 'furthest_rank', 'advanced']),
+        'event_stages': {},
+        'stage_entries': {},
+    }
+    keys = ['event_code', 'stage_code', 'participant_code']
+    if results.empty or any(col not in results.columns for col in keys):
+        return empty
+
+    rows = results.dropna(subset=keys)
+    stages = rows.groupby(['event_code', 'stage_code'], observed=True, sort=False).agg(
+        event_name=('event_name', 'first'),
+        event_stage=('event_stage', 'first'),
+        stage=('stage', 'first'),
+        date=('date', 'min'),
+        entries=('participant_code', 'size'),
+    ).reset_index()
+    stages['phase_code'] = stages['stage_code'].astype(str).str[:PHASE_CODE_LENGTH]
+    stages['stage_kind'] = stage_kinds(stages)
+    stages['stage_tier'] = stages['stage_kind'].map(STAGE_TIERS).astype('int8')
+
+    start = stages['date']
+    if stage_starts is not None:
+        start = stages['stage_code'].astype(str).map(stage_starts).fillna(start)
+    phase = [stages['event_code'], stages['phase_code'], stages['stage_kind']]
+    stages['phase_start'] = start.groupby(phase, observed=True).transform('max')
+    stages = stages.sort_values(['event_code', 'stage_tier', 'phase_start', 'phase_code', 'stage_kind', 'stage_code'],
+                                ignore_index=True)
+
+    new_phase = (stages['phase_code'].ne(stages['phase_code'].shift()) | stages['stage_kind'].ne(stages['stage_kind'].shift())
+                 | stages['event_code'].ne(stages['event_code'].shift()))
+    stages['phase_order'] = new_phase.astype('int16').groupby(stages['event_code'], observed=True).cumsum()
+
+    entries = rows[[col for col in ENTRY_COLUMNS if col in rows.columns]].merge(
+        stages[['event_code', 'stage_code', 'stage_kind', 'phase_order', 'date', 'event_stage']], on=['event_code', 'stage_code']
+    )
+    entries['progress'] = entries['stage_kind'].isin(['main', 'final'])
+    entries = entries.sort_values(['event_code', 'participant_code', 'progress', 'phase_order', 'date'], ignore_index=True)
+
+    # Last main stage of each participant (their last stage when they only took part in classification units)
+    furthest = entries.groupby(['event_code', 'participant_code'], observed=True, sort=False).tail(1)
+    furthest = furthest[['event_code', 'participant_code', 'stage_code', 'event_stage', 'phase_order', 'rank']]
+    furthest.columns = ['event_code', 'participant_code', 'furthest_stage_code', 'furthest_stage',
+                        'furthest_phase', 'furthest_rank']
+    entries = entries.merge(furthest, on=['event_code', 'participant_code'])
+    entries['advanced'] = entries['progress'] & (entries['furthest_phase'] > entries['phase_order'])
+    entries = entries.drop(columns='progress')
+
+    advanced = entries.groupby('stage_code', observed=True)['advanced'].sum()
+    stages['advanced'] = stages['stage_code'].map(advanced).fillna(0).astype('int32')
+
+    return {
+        'stages': stages,
+        'entries': entries,
+        'event_stages': key_index(stages, 'event_code'),
+        'stage_entries': key_index(entries, 'stage_code'),
+    }
+
+
+def stages_of(index, event_code):
+    """Stages of an event in the order it was contested (heats first, final last)"""
+    return rows_for(index['stages'], index['event_stages'], event_code)
+
+
+def entries_of(index, stage_code):
+    """Participants of a stage by rank, with the furthest stage each of them reached"""
+    return rows_for(index['entries'], index['stage_entries'], stage_code).sort_values('rank', na_position='last')
+
+
+def advanced_to(index, stage_code, to_stage_code):
+    """
+    Participants of a stage who also competed in a later stage, e.g. from a heat to the final.
+
+    Returns:
+    - the stage's entries of those participants with their rank in the later stage ('to_rank')
+    """
+    entries = entries_of(index, stage_code)
+    later = rows_for(index['entries'], index['stage_entries'], to_stage_code)
+    kept = entries[np.isin(entries['participant_code'].to_numpy(), later['participant_code'].to_numpy())]
+    to_rank = later.drop_duplicates('participant_code').set_index('participant_code')['rank']
+    return kept.assign(to_rank=kept['participant_code'].map(to_rank))
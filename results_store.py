@@ -0,0 +1,177 @@
+"""
+Results store module for Olympic Games Dashboard
+Contains ingestion and querying of the per-discipline result files in data/results/
+"""
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from data_loader import DATA_DIR, file_signature, read_table
+from schemas import TABLE_SCHEMAS, apply_schema, read_csv_options
+
+RESULTS_DIR = DATA_DIR / "results"
+
+# Columns a results query can be narrowed on, mapped to the store column
+RESULT_FILTERS = {
+    'event_code': 'event_code',
+    'stage_code': 'stage_code',
+    'participant_code': 'participant_code',
+    'country_code': 'participant_country_code',
+}
+
+# Typed reading of the free-text result column per result_type: (unit, higher is better).
+# Other types (IRM, NO_SCORE, RANK, ...) carry no comparable value.
+RESULT_TYPES = {
+    'TIME': ('seconds', False),
+    'DISTANCE': ('metres', True),
+    'POINTS': ('points', True),
+    'IRM_POINTS': ('points', True),
+    'SETS': ('sets', True),
+    'SCORE': ('score', True),
+    'PERCENT': ('percent', True),
+    'STROKES': ('strokes', False),
+    'WEIGHT': ('kg', True),
+    'FAULT': ('faults', False),
+    'IRM_RANK': ('faults', False),
+}
+
+# Units of result_value, the categories of result_unit
+RESULT_UNITS = tuple(dict.fromkeys(unit for unit, _ in RESULT_TYPES.values()))
+
+# Disciplines scoring penalty points (sailing net points, jumping faults): the lowest total wins
+PENALTY_POINTS_DISCIPLINES = ('Equestrian', 'Sailing')
+
+# Times written as seconds, m:ss.xx or h:mm:ss(.x)
+TIME_PATTERN = r'^(?:(?:(\d+):)?(\d+):)?(\d+(?:\.\d+)?)$'
+
+# Canoe slalom faults, one item per gate or penalty: "FLT (2, 8)", "FLT (R, 6, 8)"
+FAULT_PATTERN = r'^FLT \((.*)\)$'
+
+
+# ==================== PARTITIONS ====================
+def result_disciplines():
+    """Disciplines with a result file, i.e. the partitions of the store"""
+    return sorted(path.stem for path in RESULTS_DIR.glob("*.csv"))
+
+
+def partition_signature(discipline):
+    """Signature of a discipline's result file, or None when the file is missing"""
+    try:
+        signature = file_signature(RESULTS_DIR / f"{discipline}.csv")
+    except OSError:
+        return None
+    return signature['mtime_ns'], signature['size']
+
+
+def ingest_partition(discipline):
+    """Load one discipline's results with the shared results schema applied and result values parsed"""
+    return read_table(
+        "results_" + discipline.lower().replace(' ', '_'),
+        f"results/{discipline}.csv",
+        prepare=lambda df: parse_result_values(apply_schema('results', df)),
+        **read_csv_options('results')
+    )
+
+
+# ==================== RESULT VALUES ====================
+def _parse_values(texts):
+    """Number, time in seconds and fault count of distinct result strings"""
+    texts = pd.Series(texts, dtype=object).astype(str).str.strip()
+    number = pd.to_numeric(texts, errors='coerce')
+
+    parts = texts.str.extract(TIME_PATTERN).apply(pd.to_numeric, errors='coerce')
+    seconds = parts[0].fillna(0) * 3600 + parts[1].fillna(0) * 60 + parts[2]
+
+    faults = texts.str.extract(FAULT_PATTERN, expand=False)
+    faults = faults.str.count(',') + faults.notna()
+    return number.to_numpy(float), seconds.to_numpy(float), faults.to_numpy(float)
+
+
+def parse_result_values(df):
+    """
+    Add typed columns read from the free-text result column, for a whole partition at once.
+
+    Each distinct result string is parsed once (number, time, fault list) and the
+    reading matching the row's result_type is mapped back through factorized codes.
+
+    Returns:
+    - DataFrame with result_value (float: seconds, metres, points, ... as given by
+      result_unit, NaN when the type has no comparable value), result_unit
+      (categorical of RESULT_UNITS) and higher_is_better (nullable boolean)
+    """
+    codes, uniques = pd.factorize(df['result'])
+    # Missing results have code -1, which picks the trailing NaN
+    number, seconds, faults = (np.append(parsed, np.nan)[codes] for parsed in _parse_values(uniques))
+
+    result_types = df['result_type'].astype(object)
+    units = result_types.map({result_type: unit for result_type, (unit, _) in RESULT_TYPES.items()})
+    higher = result_types.map({result_type: higher for result_type, (_, higher) in RESULT_TYPES.items()})
+    penalty = (units == 'points') & df['discipline_name'].isin(PENALTY_POINTS_DISCIPLINES)
+    higher = higher.mask(penalty, False)
+
+    units = units.to_numpy(dtype=object)
+    values = np.select([units == 'seconds', units == 'faults', pd.notna(units)], [seconds, faults, number], np.nan)
+
+    return df.assign(
+        result_value=values,
+        result_unit=pd.Categorical(units, categories=RESULT_UNITS),
+        higher_is_better=higher.astype('boolean'),
+    )
+
+
+def combine_partitions(frames):
+    """
+    Concatenate discipline partitions into one typed results table.
+
+    Partitions have different category sets, which pd.concat would widen to
+    plain strings, so category columns are merged with union_categoricals.
+    """
+    columns = TABLE_SCHEMAS['results']['columns']
+    category_cols = TABLE_SCHEMAS['results']['category']
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+
+    combined = pd.concat([df.drop(columns=category_cols) for df in frames], ignore_index=True)
+    for col in category_cols:
+        parts = [df[col].array for df in frames]
+        # Columns that are empty in a file come back with untyped (object) categories
+        parts = [part if len(part.categories) else part.set_categories(part.categories.astype(str))
+                 for part in parts]
+        combined[col] = union_categoricals(parts, ignore_order=True)
+    # Declared columns first, then the columns derived at load (measures)
+    return combined[columns + [col for col in combined.columns if col not in columns]]
+
+
+# ==================== QUERIES ====================
+def filter_results(results_df, **criteria):
+    """
+    Narrow a results table on exact column values.
+
+    Parameters:
+    - results_df: table returned by combine_partitions()
+    - criteria: any of RESULT_FILTERS with a single value or a list of values
+
+    Returns:
+    - matching rows, in store order
+    """
+    mask = pd.Series(True, index=results_df.index)
+    for key, value in criteria.items():
+        if value is None:
+            continue
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        mask &= results_df[RESULT_FILTERS[key]].isin(values)
+    return results_df[mask]
+
+
+def result_margins(results_df):
+    """
+    Gap of each result to the best result of its stage, in the stage's result unit.
+
+    Uses result_value and higher_is_better, so times, distances and points compare
+    the same way; rows without a typed value get NaN.
+    """
+    values = results_df['result_value'].where(results_df['higher_is_better'].notna())
+    signed = values.where(results_df['higher_is_better'].fillna(True).astype(bool), -values)
+    best = signed.groupby(results_df['stage_code'], observed=True).transform('max')
+    return best - signed
@@ -0,0 +1,317 @@
+"""
+Schema module for Olympic Games Dashboard
+Contains the declared column dtypes applied to every table at ingest time
+"""
+from functools import lru_cache
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+# Timezone of the Games, used to show competition times as local times
+GAMES_TZ = "Europe/Paris"
+
+# Plausibility bounds of the measures parsed from text: smaller values are parts of
+# other numbers (distances, ages) rather than weight classes or heights
+MIN_WEIGHT_KG = 30
+MIN_HEIGHT_CM = 100
+
+POUND_KG = 0.453592
+
+# Opening day of the Games, the reference date of ages
+GAMES_OPENING = pd.Timestamp("2024-07-26")
+
+# Age groups of the demographics charts: [lower, upper) bounds and their labels
+AGE_BINS = (10, 20, 25, 30, 35, 40, 50, 61)
+AGE_LABELS = ('10-19', '20-24', '25-29', '30-34', '35-39', '40-49', '50-60')
+
+# ==================== TABLE SCHEMAS ====================
+# Per table:
+# - columns: fixed column order (missing columns are added empty)
+# - category: low-cardinality text columns stored as integer codes
+# - text: free-text columns kept as strings even when they look numeric
+# - integer: numeric columns downcast to the given (nullable when NaN is possible) dtype
+# - timestamp: datetime columns with a UTC offset, normalized to UTC
+# - date: calendar dates without a time of day
+# - time_parts: timestamp/date columns broken down at load into <prefix>_day, <prefix>_hour
+#   (timestamps only) and <prefix>_iso_week, in Games local time
+# - measures: event name columns parsed at load into <prefix>_weight_kg (weight class)
+#   and <prefix>_height_cm, once per distinct name
+# - age: birth date column turned at load into age_at_games (completed years on the
+#   opening day) and age_group (AGE_LABELS, empty outside AGE_BINS)
+# Columns missing from a CSV are skipped, so the schemas also tolerate older exports.
+TABLE_SCHEMAS = {
+    'athletes': {
+        'category': ['gender', 'function', 'country_code', 'country', 'country_long',
+                     'nationality', 'nationality_long', 'nationality_code'],
+        'integer': {'code': 'int32'},
+        'date': ['birth_date'],
+        'age': 'birth_date',
+    },
+    'coaches': {
+        'category': ['gender', 'function', 'category', 'country_code', 'country', 'country_long', 'disciplines'],
+        'integer': {'code': 'int32'},
+        'date': ['birth_date'],
+        'age': 'birth_date',
+    },
+    'events': {
+        'category': ['tag', 'sport', 'sport_code'],
+    },
+    'medals': {
+        'category': ['medal_type', 'gender', 'discipline', 'event_type', 'country_code', 'country', 'country_long'],
+        'integer': {'medal_code': 'Int8'},
+        'date': ['medal_date'],
+        'time_parts': {'medal_date': 'medal'},
+        'measures': {'event': 'event'},
+    },
+    'medals_total': {
+        'category': ['country_code', 'country', 'country_long'],
+        'integer': {'Gold Medal': 'int16', 'Silver Medal': 'int16', 'Bronze Medal': 'int16', 'Total': 'int16'},
+    },
+    'medallists': {
+        'category': ['medal_type', 'gender', 'country_code', 'country', 'country_long', 'nationality_code',
+                     'nationality', 'nationality_long', 'team_gender', 'discipline', 'event_type'],
+        'integer': {'medal_code': 'Int8', 'code_athlete': 'int32'},
+        'date': ['medal_date', 'birth_date'],
+        'time_parts': {'medal_date': 'medal'},
+        'measures': {'event': 'event'},
+        'age': 'birth_date',
+    },
+    'nocs': {
+        'category': ['note'],
+    },
+    'schedules': {
+        'category': ['status', 'discipline', 'discipline_code', 'gender', 'event_type', 'venue', 'venue_code',
+                     'location_description', 'location_code'],
+        'integer': {'event_medal': 'int8'},
+        'timestamp': ['start_date', 'end_date'],
+        'date': ['day'],
+        'time_parts': {'start_date': 'start'},
+    },
+    'schedules_preliminary': {
+        'category': ['venue_code', 'tag', 'sport', 'sport_code'],
+        'integer': {'medal': 'Int8'},
+        'timestamp': ['date_start_utc', 'date_end_utc'],
+        'time_parts': {'date_start_utc': 'start'},
+    },
+    'teams': {
+        'category': ['team_gender', 'country_code', 'country', 'country_long', 'discipline', 'disciplines_code'],
+        'integer': {'num_athletes': 'Int16', 'num_coaches': 'Int16'},
+    },
+    'technical_officials': {
+        'category': ['gender', 'function', 'category', 'organisation_code', 'organisation', 'organisation_long'],
+        'integer': {'code': 'int32'},
+        'date': ['birth_date'],
+        'age': 'birth_date',
+    },
+    'torch_route': {
+        'integer': {'stage_number': 'Int16'},
+        'timestamp': ['date_start', 'date_end'],
+        'time_parts': {'date_start': 'start'},
+    },
+    'venues': {
+        'timestamp': ['date_start', 'date_end'],
+    },
+    # Shared by every per-discipline file in data/results/
+    'results': {
+        'columns': ['date', 'stage_code', 'event_code', 'event_name', 'event_stage', 'stage', 'gender',
+                    'discipline_name', 'discipline_code', 'venue', 'participant_code', 'participant_name',
+                    'participant_type', 'participant_country_code', 'participant_country', 'rank', 'result',
+                    'result_type', 'result_WLT', 'result_IRM', 'result_diff', 'qualification_mark',
+                    'start_order', 'bib'],
+        'category': ['stage_code', 'event_code', 'event_name', 'event_stage', 'stage', 'gender',
+                     'discipline_name', 'discipline_code', 'venue', 'participant_type',
+                     'participant_country_code', 'participant_country', 'result_type', 'result_WLT',
+                     'result_IRM', 'qualification_mark', 'start_order'],
+        'text': ['participant_code', 'participant_name', 'result', 'result_diff', 'bib'],
+        'integer': {'rank': 'Int16'},
+        'timestamp': ['date'],
+        'measures': {'event_name': 'event'},
+    },
+    # Bridge table exploded from athletes.events (see data_loader.BRIDGE_TABLES)
+    'athlete_events': {
+        'measures': {'event': 'event'},
+    },
+}
+
+# ==================== LOGICAL FIELDS ====================
+# Logical field -> physical column candidates, in order of preference. Tables name the
+# same thing differently (country_long vs country, 'Gold Medal' vs gold), so code
+# addresses fields through resolve_columns() instead of probing df.columns.
+FIELD_COLUMNS = {
+    'country': ('country_long', 'country'),
+    'country_code': ('country_code',),
+    'continent': ('continent',),
+    'sport': ('sport', 'discipline', 'discipline_name'),
+    'gender': ('gender', 'team_gender'),
+    'medal_type': ('medal_type',),
+    'gold': ('Gold Medal', 'gold_medals', 'gold'),
+    'silver': ('Silver Medal', 'silver_medals', 'silver'),
+    'bronze': ('Bronze Medal', 'bronze_medals', 'bronze'),
+    'total': ('Total', 'total_medals', 'total'),
+    'date': ('start_date', 'medal_date', 'date'),
+}
+
+# Medal count fields in podium order
+MEDAL_FIELDS = ('gold', 'silver', 'bronze')
+
+# Value of each medal field in the medal_type column of per-medal tables (medals, medallists)
+MEDAL_TYPES = {'gold': 'Gold Medal', 'silver': 'Silver Medal', 'bronze': 'Bronze Medal'}
+
+
+@lru_cache(maxsize=None)
+def _resolve(columns):
+    resolved = {}
+    for field, candidates in FIELD_COLUMNS.items():
+        for candidate in candidates:
+            if candidate in columns:
+                resolved[field] = candidate
+                break
+    return MappingProxyType(resolved)
+
+
+def resolve_columns(df):
+    """
+    Map logical fields to the physical columns of a frame.
+
+    Resolved once per column layout, so filtered frames of the same table
+    reuse the same mapping; fields the frame does not have are absent.
+
+    Returns:
+    - read-only mapping such as {'country': 'country_long', 'gold': 'Gold Medal', ...}
+    """
+    return _resolve(tuple(df.columns))
+
+
+def read_csv_options(name):
+    """pd.read_csv keyword arguments for a table (categories are built by the parser)"""
+    schema = TABLE_SCHEMAS.get(name, {})
+    dtype = {col: 'category' for col in schema.get('category', [])}
+    dtype.update({col: str for col in schema.get('text', [])})
+    return {'dtype': dtype}
+
+
+def apply_schema(name, df):
+    """
+    Cast the columns of a freshly parsed table to their declared dtypes.
+
+    Parameters:
+    - name: table name in TABLE_SCHEMAS
+    - df: DataFrame returned by pd.read_csv(..., **read_csv_options(name))
+
+    Returns:
+    - DataFrame with the declared columns, integer, timestamp and date columns converted
+      and the time_parts, measures and age columns added
+    """
+    schema = TABLE_SCHEMAS.get(name, {})
+
+    if 'columns' in schema:
+        df = df.reindex(columns=schema['columns'])
+        for col in schema.get('category', []):
+            if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype(object).astype('category')
+        for col in schema.get('text', []):
+            if df[col].isna().all():
+                df[col] = df[col].astype(object)
+
+    for col, dtype in schema.get('integer', {}).items():
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(dtype)
+
+    for col in schema.get('timestamp', []):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], utc=True, errors='coerce')
+
+    for col in schema.get('date', []):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+
+    for col, prefix in schema.get('time_parts', {}).items():
+        if col in df.columns:
+            df = df.assign(**time_parts(df[col], prefix))
+
+    for col, prefix in schema.get('measures', {}).items():
+        if col in df.columns:
+            df = df.assign(**measure_parts(df[col], prefix))
+
+    if schema.get('age') in df.columns:
+        df = df.assign(**age_parts(df[schema['age']]))
+
+    return df
+
+
+def time_parts(values, prefix):
+    """
+    Break a timestamp or date column down into its calendar parts, in Games local time.
+
+    Parameters:
+    - values: tz-aware (UTC) timestamps, or naive calendar dates
+    - prefix: name prefix of the derived columns
+
+    Returns:
+    - dict of <prefix>_day (local midnight), <prefix>_hour (timestamps only) and <prefix>_iso_week
+    """
+    local = values.dt.tz_convert(GAMES_TZ).dt.tz_localize(None) if values.dt.tz is not None else values
+    parts = {f'{prefix}_day': local.dt.normalize()}
+    if values.dt.tz is not None:
+        parts[f'{prefix}_hour'] = local.dt.hour.astype('Int8')
+    parts[f'{prefix}_iso_week'] = local.dt.isocalendar().week.astype('Int8')
+    return parts
+
+
+def age_parts(birth_dates):
+    """
+    Age of each person on the opening day of the Games and its age group.
+
+    Returns:
+    - dict of age_at_games (Int8) and age_group (ordered categorical of AGE_LABELS)
+    """
+    had_birthday = ((birth_dates.dt.month < GAMES_OPENING.month)
+                    | ((birth_dates.dt.month == GAMES_OPENING.month) & (birth_dates.dt.day <= GAMES_OPENING.day)))
+    ages = GAMES_OPENING.year - birth_dates.dt.year - (~had_birthday).astype(int)
+    ages = ages.where(birth_dates.notna() & ages.between(0, 120)).astype('Int8')
+    groups = pd.cut(ages.astype(float), bins=AGE_BINS, labels=AGE_LABELS, right=False)
+    return {'age_at_games': ages, 'age_group': groups}
+
+
+def _number(match):
+    return pd.to_numeric(match, errors='coerce')
+
+
+def measure_parts(values, prefix):
+    """
+    Parse the weight class and height written in event names ("Men -60 kg", "Women 63-70kg").
+
+    Patterns are matched once per distinct value with vectorized str.extract and the
+    results are mapped back to the rows by their factorized codes. Weight ranges give
+    their midpoint and pounds are converted; heights are read in cm, m or feet'inches.
+
+    Returns:
+    - dict of <prefix>_weight_kg and <prefix>_height_cm float32 columns (NaN when absent)
+    """
+    codes, uniques = pd.factorize(values)
+    text = pd.Series(uniques, dtype=object).astype(str).str.lower()
+
+    weight_range = text.str.extract(r'(\d+\.?\d*)\s*-\s*(\d+\.?\d*)\s*kg').apply(_number).mean(axis=1, skipna=False)
+    weight = _number(text.str.extract(r'(\d+\.?\d*)\s*(?:kgs?|kilograms?)\b', expand=False))
+    pounds = _number(text.str.extract(r'(\d+\.?\d*)\s*(?:lbs?|pounds?)\b', expand=False)) * POUND_KG
+    weight = weight_range.fillna(weight).fillna(pounds).round(1)
+
+    height = _number(text.str.extract(r'(\d+\.?\d*)\s*(?:cm|centimeters?)\b', expand=False))
+    metres = _number(text.str.extract(r'\b(\d\.\d+)\s*m\b', expand=False)) * 100
+    feet = text.str.extract(r"(\d+)'\s*(\d+)").apply(_number)
+    height = height.fillna(metres).fillna(feet[0] * 30.48 + feet[1] * 2.54).round(1)
+
+    parts = {}
+    for suffix, parsed, minimum in (('weight_kg', weight, MIN_WEIGHT_KG), ('height_cm', height, MIN_HEIGHT_CM)):
+        # Missing values have code -1, which picks the trailing NaN
+        parsed = np.append(parsed.where(parsed > minimum).to_numpy(dtype=np.float32), np.float32('nan'))
+        parts[f'{prefix}_{suffix}'] = parsed[codes]
+    return parts
+
+
+def height_cm(values):
+    """Heights in cm from a numeric column recorded in cm or metres (0 or missing -> NaN)"""
+    heights = pd.to_numeric(values, errors='coerce')
+    heights = heights.where(heights > 3, heights * 100)
+    return heights.where(heights > MIN_HEIGHT_CM).round(1).astype(np.float32)
@@ -0,0 +1,93 @@
+"""
+Start bias module for Olympic Games Dashboard
+Contains the start order (lane, starting position) statistics of every heat
+in the results store, pre-aggregated into a cube and rolled up per drilldown
+"""
+import pandas as pd
+
+# Dimensions of the cube: drilldown levels, then the start position
+BIAS_DIMENSIONS = ('discipline_name', 'stage_type', 'start_order')
+
+# Numbered heats of one round ("Round 1 - Heat 3", "Race 8", "Quarterfinal 2"), whose number
+# is dropped from the stage type; other numbers name distinct rounds ("Round 2", "Table of 32")
+HEAT_NUMBER_PATTERN = r'\b(Heat|Race|Rotation|Quarterfinal|Semifinal|Semi-Final)\s*\d+$'
+
+# Start positions with fewer starts than this are left out of a rollup (too few to compare)
+MIN_STARTS = 10
+
+
+def build_bias_cube(results):
+    """
+    Aggregate every ranked start of the results store by discipline, stage type and position.
+
+    Only numeric start orders are kept (lanes, starting positions; not corner colours
+    such as RED/BLUE). Each start also gets its relative rank, 0 for the winner and 1
+    for the last of the stage, so stages of different sizes compare. Counts and rank
+    sums are additive, so any drilldown is a filter and a sum over the cube.
+
+    Returns:
+    - DataFrame with BIAS_DIMENSIONS and starts, wins, rank_sum, relative_rank_sum
+    """
+    columns = list(BIAS_DIMENSIONS) + ['starts', 'wins', 'rank_sum', 'relative_rank_sum']
+    needed = ['discipline_name', 'stage', 'stage_code', 'start_order', 'rank']
+    if results.empty or any(col not in results.columns for col in needed):
+        return pd.DataFrame(columns=columns)
+
+    start_order = pd.to_numeric(results['start_order'].astype(object), errors='coerce')
+    ranked = results[start_order.notna().to_numpy() & results['rank'].notna().to_numpy()]
+    ranked = ranked.assign(start_order=start_order[ranked.index].astype('int16'), rank=ranked['rank'].astype('int32'))
+
+    field = ranked.groupby('stage_code', observed=True)['rank'].transform('size')
+    starts = pd.DataFrame({
+        'discipline_name': ranked['discipline_name'],
+        # "Round 1 - Heat 3" -> "Round 1 - Heat": heats of the same round share a stage type
+        'stage_type': ranked['stage'].astype(str).str.replace(HEAT_NUMBER_PATTERN, r'\1', regex=True).str.strip().astype('category'),
+        'start_order': ranked['start_order'],
+        'wins': (ranked['rank'] == 1).astype('int32'),
+        'rank_sum': ranked['rank'],
+        'relative_rank_sum': ((ranked['rank'] - 1) / (field - 1).where(field > 1)).fillna(0),
+    })
+
+    cube = starts.groupby(list(BIAS_DIMENSIONS), observed=True).agg(
+        starts=('wins', 'size'),
+        wins=('wins', 'sum'),
+        rank_sum=('rank_sum', 'sum'),
+        relative_rank_sum=('relative_rank_sum', 'sum'),
+    ).reset_index()
+    return cube[columns]
+
+
+def bias_rollup(cube, discipline=None, stage_type=None, min_starts=MIN_STARTS):
+    """
+    Rank statistics per start position for a discipline and/or stage type (all of them when None).
+
+    Returns:
+    - DataFrame with start_order, starts, mean_rank, mean_relative_rank and win_rate,
+      one row per position with at least min_starts starts, in position order
+    """
+    columns = ['start_order', 'starts', 'mean_rank', 'mean_relative_rank', 'win_rate']
+    if cube.empty:
+        return pd.DataFrame(columns=columns)
+
+    mask = pd.Series(True, index=cube.index)
+    if discipline is not None:
+        mask &= cube['discipline_name'] == discipline
+    if stage_type is not None:
+        mask &= cube['stage_type'] == stage_type
+
+    totals = cube[mask].groupby('start_order', observed=True)[['starts', 'wins', 'rank_sum', 'relative_rank_sum']].sum()
+    totals = totals[totals['starts'] >= min_starts]
+    return pd.DataFrame({
+        'starts': totals['starts'],
+        'mean_rank': totals['rank_sum'] / totals['starts'],
+        'mean_relative_rank': totals['relative_rank_sum'] / totals['starts'],
+        'win_rate': totals['wins'] / totals['starts'],
+    }).reset_index()[columns]
+
+
+def bias_stage_types(cube, discipline=None):
+    """Stage types of the cube (of one discipline when given), by number of starts"""
+    if cube.empty:
+        return []
+    rows = cube if discipline is None else cube[cube['discipline_name'] == discipline]
+    return rows.groupby('stage_type', observed=True)['starts'].sum().sort_values(ascending=False).index.tolist()
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from competition_keys import build_stage_keys, linked_rows, stage_key_of, stage_start_times
+
+EVENT = 'ATHM100M--------------'
+PAGE = '/en/paris-2024/results/athletics/men-s-100m/'
+
+
+def heats():
+    return pd.DataFrame({
+        'discipline_name': 'Athletics',
+        'event_name': "Men's 100m",
+        'event_code': EVENT,
+        'stage_code': [EVENT + 'RND1000100--', EVENT + 'RND1000200--', EVENT + 'FNL-000100--'],
+        'participant_code': ['a', 'b', 'a'],
+    })
+
+
+def test_round_session_links_to_all_its_heats():
+    schedules = pd.DataFrame({
+        'url': [PAGE + 'rnd1--------', PAGE + 'fnl-000100--'],
+        'start_date': pd.to_datetime(['2024-08-03 10:00', '2024-08-04 21:50'], utc=True),
+    })
+    keys = build_stage_keys(schedules, pd.DataFrame(columns=['url_event']), heats())
+
+    round_rows = linked_rows(heats(), keys, 'result', stage_key_of(keys, 0))
+    assert sorted(round_rows['stage_code']) == [EVENT + 'RND1000100--', EVENT + 'RND1000200--']
+    assert linked_rows(heats(), keys, 'result', stage_key_of(keys, 1))['participant_code'].tolist() == ['a']
+
+
+def test_stage_start_is_latest_linked_session():
+    schedules = pd.DataFrame({
+        'url': [PAGE + 'rnd1--------', PAGE + 'rnd1--------'],
+        'start_date': pd.to_datetime(['2024-08-03 10:00', '2024-08-03 11:00'], utc=True),
+    })
+    keys = build_stage_keys(schedules, pd.DataFrame(columns=['url_event']), heats())
+
+    starts = stage_start_times(keys, schedules)
+    assert starts[EVENT + 'RND1000200--'] == pd.Timestamp('2024-08-03 11:00', tz='UTC')
+    assert EVENT + 'FNL-000100--' not in starts.index
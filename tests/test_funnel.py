@@ -0,0 +1,58 @@
+import pandas as pd
+
+from funnel import funnel_participants, medal_mismatches, qualification_funnel
+from progression import build_progression_index
+
+ROWING = 'ROWMSCULL1------------'
+GOLF = 'GLFMINDL--------------'
+
+
+def results():
+    rows = [(ROWING, 'SFNL000100--', 'Semifinal A/B 1', crew) for crew in 'abcd'] + [
+        (ROWING, 'FNL-000100--', 'Final A', 'a'),
+        (ROWING, 'FNL-000100--', 'Final A', 'b'),
+        (ROWING, 'FNL-000200--', 'Final B', 'c'),
+        (ROWING, 'FNL-000200--', 'Final B', 'd'),
+        (GOLF, 'FNL-000100--', 'Round 1', 'g'),
+        (GOLF, 'FNL-000100--', 'Round 1', 'h'),
+    ]
+    return pd.DataFrame({
+        'event_code': [row[0] for row in rows],
+        'stage_code': [row[0] + row[1] for row in rows],
+        'event_name': 'Event',
+        'event_stage': [row[2] for row in rows],
+        'stage': [row[2] for row in rows],
+        'date': pd.Timestamp('2024-07-31', tz='UTC'),
+        'discipline_name': ['Golf' if row[0] == GOLF else 'Rowing' for row in rows],
+        'gender': 'M',
+        'participant_code': [row[3] for row in rows],
+        'participant_country': 'France',
+        'participant_country_code': 'FRA',
+        'rank': 1,
+    })
+
+
+def participants():
+    medals = pd.DataFrame({'code': ['a', 'g'], 'discipline': ['Rowing', 'Golf'], 'event': ['Event', 'Event']})
+    event_codes = pd.Series([ROWING, GOLF])
+    nocs = pd.DataFrame({'code': ['FRA'], 'country_long': ['France']})
+    return funnel_participants(build_progression_index(results()), nocs, medals, event_codes), medals
+
+
+def test_final_b_is_not_a_final():
+    rows, _ = participants()
+    rowing = rows[rows['discipline_name'] == 'Rowing']
+    assert rowing['semifinal'].sum() == 4
+    assert rowing['final'].sum() == 2
+
+
+def test_single_phase_event_is_not_a_semifinal():
+    rows, medals = participants()
+    golf = rows[rows['discipline_name'] == 'Golf']
+    assert not golf['semifinal_round'].any()
+    assert not golf['semifinal'].any() and not golf['final'].any()
+
+    funnel = qualification_funnel(rows).iloc[0]
+    assert (funnel['entries'], funnel['semifinal'], funnel['final'], funnel['medal']) == (4, 4, 2, 1)
+    assert funnel['no_semifinal_round'] == 2
+    assert medal_mismatches(rows, medals).empty
@@ -0,0 +1,57 @@
+import pandas as pd
+
+from progression import build_progression_index, stages_of
+
+JUDO = 'JUDM60KG--------------'
+ROWING = 'ROWMSCULL1------------'
+
+
+def results(rows):
+    """Results table from (event_code, round code + unit, stage, recorded at, participant) tuples"""
+    return pd.DataFrame({
+        'event_code': [row[0] for row in rows],
+        'stage_code': [row[0] + row[1] for row in rows],
+        'event_name': 'Event',
+        'event_stage': [row[2] for row in rows],
+        'stage': [row[2] for row in rows],
+        'date': pd.to_datetime([row[3] for row in rows], utc=True),
+        'participant_code': [row[4] for row in rows],
+        'rank': 1,
+    })
+
+
+def test_repechage_follows_r32_in_schedule_order():
+    # Result timestamps are when results were entered: the R32 is stamped after the final
+    judo = results([
+        (JUDO, 'R32-000100--', 'Round of 32', '2024-07-27 20:26', 'a'),
+        (JUDO, 'R32-000100--', 'Round of 32', '2024-07-27 20:26', 'b'),
+        (JUDO, 'REP-000100--', 'Repechage', '2024-07-27 16:30', 'b'),
+        (JUDO, 'FNL-000100--', 'Final', '2024-07-27 18:35', 'a'),
+    ])
+    starts = pd.Series(pd.to_datetime(['2024-07-27 10:00', '2024-07-27 16:00', '2024-07-27 18:00'], utc=True),
+                       index=[JUDO + 'R32-000100--', JUDO + 'REP-000100--', JUDO + 'FNL-000100--'])
+
+    stages = stages_of(build_progression_index(judo, starts), JUDO)
+    assert stages['stage'].tolist() == ['Round of 32', 'Repechage', 'Final']
+    assert stages['phase_order'].tolist() == [1, 2, 3]
+
+
+def test_classification_finals_get_their_own_phase():
+    rowing = results([
+        (ROWING, 'SFNL000100--', 'Semifinal A/B 1', '2024-07-30 09:00', crew) for crew in 'abcd'
+    ] + [
+        (ROWING, 'FNL-000200--', 'Final B', '2024-07-31 09:00', 'c'),
+        (ROWING, 'FNL-000200--', 'Final B', '2024-07-31 09:00', 'd'),
+        (ROWING, 'FNL-000100--', 'Final A', '2024-07-31 10:00', 'a'),
+        (ROWING, 'FNL-000100--', 'Final A', '2024-07-31 10:00', 'b'),
+    ])
+
+    index = build_progression_index(rowing)
+    stages = stages_of(index, ROWING).set_index('stage')
+    assert stages['stage_kind'].to_dict() == {'Semifinal A/B 1': 'main', 'Final B': 'placing', 'Final A': 'final'}
+    assert stages.loc['Final B', 'phase_order'] != stages.loc['Final A', 'phase_order']
+    assert stages.loc['Semifinal A/B 1', 'advanced'] == 2
+
+    furthest = index['entries'].drop_duplicates('participant_code').set_index('participant_code')['furthest_stage']
+    assert furthest['c'] == 'Semifinal A/B 1'
+    assert furthest['a'] == 'Final A'